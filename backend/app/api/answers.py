@@ -1,46 +1,74 @@
+from typing import Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.schemas.schemas import AnswerCreate, AnswerResponse
-from app.models.models import Answer, Question
-from app.services.services import AnswerService
+from app.db.replicas import get_read_db
+from app.utils.serialization import trusted_response
+from app.api.deps import CurrentUser, get_current_user
+from app.api.questions import CURSOR_DESCRIPTION
+from app.schemas.schemas import VoteResponse, AnswerCreate, AnswerResponse, AnswerPage
+from app.models.models import ReactionType, Answer, Question
+from app.services.services import AnswerService, VoteService
+from app.repositories.ranking import hot_questions
+from app.utils.entity_cache import entity_cache
 
 router = APIRouter()
 
 @router.post("/", response_model=AnswerResponse, status_code=status.HTTP_201_CREATED)
-def create_answer(answer: AnswerCreate, author_id: int = Query(...), db: Session = Depends(get_db)):
+async def create_answer(answer: AnswerCreate, current_user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Create a new answer."""
     service = AnswerService(db)
     try:
-        return service.create_answer(answer, author_id)
+        return trusted_response(
+            await service.create_answer(answer, current_user.id), status.HTTP_201_CREATED
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
+@router.get("/", response_model=Union[list[AnswerResponse], AnswerPage])
+async def get_answers(
+    question_id: int = Query(...),
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get answers for a question."""
+    service = AnswerService(db)
+    if cursor is not None:
+        try:
+            return trusted_response(await service.get_question_answers_page(question_id, cursor, limit))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return trusted_response(await service.get_question_answers(question_id, skip, limit))
+
 @router.get("/{answer_id}", response_model=AnswerResponse)
-def get_answer(answer_id: int, db: Session = Depends(get_db)):
+async def get_answer(answer_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get answer by ID."""
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
-    if not answer:
+    service = AnswerService(db)
+    try:
+        return trusted_response(await service.get_answer(answer_id))
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Answer not found"
+            detail=str(e)
         )
-    
-    service = AnswerService(db)
-    return service._format_answer(answer)
 
 @router.put("/{answer_id}", response_model=AnswerResponse)
-def update_answer(
+async def update_answer(
     answer_id: int,
     content: str = Query(..., min_length=20),
-    author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an answer."""
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
+    answer = await db.get(Answer, answer_id)
     
     if not answer:
         raise HTTPException(
@@ -48,27 +76,27 @@ def update_answer(
             detail="Answer not found"
         )
     
-    if answer.author_id != author_id:
+    if answer.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only edit your own answers"
         )
     
     answer.content = content
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await entity_cache.bump("answer", answer_id)
     
     service = AnswerService(db)
-    return service._format_answer(answer)
+    return trusted_response(service._format_answer(await service.answer_repo.get_answer_by_id(answer_id)))
 
 @router.delete("/{answer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_answer(
+async def delete_answer(
     answer_id: int,
-    author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an answer."""
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
+    answer = await db.get(Answer, answer_id)
     
     if not answer:
         raise HTTPException(
@@ -76,24 +104,26 @@ def delete_answer(
             detail="Answer not found"
         )
     
-    if answer.author_id != author_id:
+    if answer.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only delete your own answers"
         )
     
-    db.delete(answer)
-    db.commit()
+    await AnswerService(db).answer_repo.delete_answer(answer)
+    hot_questions.record(answer.question_id, answers=-1)
+    await entity_cache.bump("answer", answer_id)
+    await entity_cache.bump("question", answer.question_id)
     return None
 
 @router.post("/{answer_id}/accept", status_code=status.HTTP_200_OK)
-def accept_answer(
+async def accept_answer(
     answer_id: int,
-    question_author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark answer as accepted."""
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
+    answer = await db.get(Answer, answer_id)
     
     if not answer:
         raise HTTPException(
@@ -102,40 +132,53 @@ def accept_answer(
         )
     
     # Verify that the user accepting the answer is the question author
-    question = db.query(Question).filter(Question.id == answer.question_id).first()
-    if question.author_id != question_author_id:
+    question = await db.get(Question, answer.question_id)
+    if question.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the question author can accept answers"
         )
     
-    # Unaccept other answers for this question
-    db.query(Answer).filter(
-        Answer.question_id == answer.question_id,
-        Answer.id != answer_id
-    ).update({"is_accepted": False})
-    
-    answer.is_accepted = True
-    db.commit()
-    
-    return {"is_accepted": answer.is_accepted}
+    return await AnswerService(db).accept_answer(answer, current_user.id)
 
-@router.post("/{answer_id}/upvote", status_code=status.HTTP_200_OK)
-def upvote_answer(
+@router.post("/{answer_id}/upvote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def upvote_answer(
     answer_id: int,
-    user_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Upvote an answer."""
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
-    
-    if not answer:
+    return await _cast_vote(db, current_user.id, answer_id, ReactionType.UPVOTE)
+
+@router.post("/{answer_id}/downvote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def downvote_answer(
+    answer_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Downvote an answer."""
+    return await _cast_vote(db, current_user.id, answer_id, ReactionType.DOWNVOTE)
+
+@router.delete("/{answer_id}/vote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def retract_answer_vote(
+    answer_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Withdraw a vote on an answer."""
+    return await _cast_vote(db, current_user.id, answer_id, None)
+
+async def _cast_vote(db: AsyncSession, user_id: int, answer_id: int, vote_type):
+    service = VoteService(db)
+    try:
+        return await service.vote(user_id, "answer", answer_id, vote_type)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Answer not found"
+            detail=str(e)
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
         )
-    
-    answer.vote_count += 1
-    db.commit()
-    
-    return {"vote_count": answer.vote_count}
@@ -1,56 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.schemas.schemas import CategoryCreate, CategoryResponse
-from app.models.models import Category
-from app.services.services import CategoryService
+from app.db.replicas import get_read_db
+from app.utils.serialization import trusted_response
+from app.api.questions import CURSOR_DESCRIPTION
+from app.schemas.schemas import CategoryCreate, CategoryResponse, QuestionResponse, QuestionPage
+from app.services.services import CategoryService, QuestionService
+from app.utils.cache import cached_response
 
 router = APIRouter()
 
 @router.get("/", response_model=list[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get all categories."""
     service = CategoryService(db)
-    return service.get_all_categories()
+    return cached_response(request, await service.get_all_categories_entry())
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_db)):
     """Create new category (admin only)."""
-    db_category = Category(
+    service = CategoryService(db)
+    return await service.create_category(
         name=category.name,
         description=category.description,
         icon_url=category.icon_url,
         color_hex=category.color_hex
     )
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
-    return db_category
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(category_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get category by ID."""
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
+    entry = await CategoryService(db).get_category_entry(category_id)
+    if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
-    return category
+    return cached_response(request, entry)
 
-@router.get("/{category_id}/questions")
-def get_category_questions(category_id: int, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+@router.get("/{category_id}/questions", response_model=Union[list[QuestionResponse], QuestionPage])
+async def get_category_questions(
+    category_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all questions in a category."""
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
+    if not await CategoryService(db).get_category_entry(category_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
-    from app.models.models import Question
-    questions = db.query(Question).filter(
-        Question.category_id == category_id
-    ).offset(skip).limit(limit).all()
-    
-    return questions
+    service = QuestionService(db)
+    if cursor is not None:
+        try:
+            return trusted_response(await service.get_questions_page(cursor, limit, category_id))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return trusted_response(await service.get_questions_by_category(category_id, skip, limit))
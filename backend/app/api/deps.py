@@ -0,0 +1,94 @@
+import time
+from typing import NamedTuple, Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import get_db
+from app.models.models import UserRole
+from app.repositories.repositories import UserRepository
+from app.utils.cache import ExpiringLRU
+from app.utils.security import decode_access_token
+
+class CurrentUser(NamedTuple):
+    """The authenticated user, as much of it as authorization needs."""
+    id: int
+    email: str
+    username: str
+    role: UserRole
+    is_active: bool
+
+# Claims of tokens whose signature has already been checked, until they expire
+token_cache = ExpiringLRU("auth_tokens", maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+
+# CurrentUser by token subject (email), for AUTH_USER_CACHE_TTL seconds
+auth_user_cache = ExpiringLRU("auth_users", maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def verified_subject(authorization: str) -> Optional[str]:
+    """Subject of a bearer token this process has already verified; None otherwise."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    claims = token_cache.get(token)
+    return claims["sub"] if claims is not None else None
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
+    """
+    Resolve the bearer token to the current user.
+    
+    Repeat requests with the same token skip JWT verification and the
+    user lookup, so they cost two dictionary reads and no database I/O.
+    """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    token = credentials.credentials
+    
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_access_token(token)
+        if not claims or not claims.get("sub") or "exp" not in claims:
+            raise _unauthorized("Invalid or expired token")
+        token_cache.set(token, claims, expires_at=claims["exp"])
+    
+    subject = claims["sub"]
+    current_user = auth_user_cache.get(subject)
+    if current_user is None:
+        user = await UserRepository(db).get_user_by_email(subject)
+        if not user:
+            raise _unauthorized("User not found")
+        current_user = CurrentUser(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active
+        )
+        auth_user_cache.set(subject, current_user, expires_at=time.time() + settings.AUTH_USER_CACHE_TTL)
+    
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    return current_user
+
+async def get_current_moderator(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    """The current user, who must be a moderator or an admin."""
+    if current_user.role not in (UserRole.MODERATOR, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Moderator privileges required"
+        )
+    return current_user
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from app.db.counters import question_views
+from app.db.database import engine
+from app.db.jobs import job_queue
+from app.db.pool import pool_metrics
+from app.db.profiling import sql_profiler
+from app.db.replicas import replica_router
+from app.db.reputation import pending_stats, reputation_aggregator
+from app.repositories.leaderboard import reputation_leaderboard
+from app.repositories.ranking import hot_questions
+from app.utils.cache import LocalCache
+from app.utils.metrics import metrics_exporter
+from app.utils.security import password_hasher
+
+router = APIRouter()
+
+@router.get("", response_class=Response)
+async def get_prometheus_metrics():
+    """Prometheus exposition: per-route latency histograms, in-flight requests, DB pool and caches."""
+    return Response(metrics_exporter.render(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@router.get("/views")
+async def get_view_counter_metrics():
+    """Write-behind view counter: pending rows, flush sizes and lag."""
+    return question_views.stats()
+
+@router.get("/db")
+async def get_db_pool_metrics():
+    """Connection pool: checked-out connections, checkout wait time and timeouts."""
+    return pool_metrics.stats(engine.sync_engine.pool)
+
+@router.get("/replicas")
+async def get_replica_metrics():
+    """Read replicas: health, reads served, and reads kept on the primary."""
+    return replica_router.stats()
+
+@router.get("/sql")
+async def get_sql_profile_metrics():
+    """Sampled requests: statements and DB time per request, likely N+1s and slow statements."""
+    return sql_profiler.stats()
+
+@router.get("/passwords")
+async def get_password_hasher_metrics():
+    """Password hashing pool: queue depth, completed and rejected operations."""
+    return password_hasher.stats()
+
+@router.get("/hot")
+async def get_hot_questions_metrics():
+    """Hot questions index: size and rebuild timing."""
+    return hot_questions.stats()
+
+@router.get("/reputation")
+async def get_reputation_metrics():
+    """Reputation ledger: pending events, oldest pending age and fold batches."""
+    async with engine.connect() as conn:
+        pending = await pending_stats(conn)
+    return {**pending, **reputation_aggregator.stats()}
+
+@router.get("/leaderboard")
+async def get_leaderboard_metrics():
+    """Reputation leaderboard index: size and rebuild timing."""
+    return reputation_leaderboard.stats()
+
+@router.get("/jobs")
+async def get_job_metrics():
+    """Background jobs: queue depth, retries, failures and lag."""
+    return job_queue.stats()
+
+@router.get("/caches")
+async def get_cache_metrics():
+    """Caches (process-local and the entity cache): entries, hits and misses."""
+    return [cache.stats() for cache in LocalCache.registry.values()]
@@ -1,62 +1,125 @@
+from typing import Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.bulk import export_ndjson
 from app.db.database import get_db
-from app.schemas.schemas import QuestionCreate, QuestionResponse, QuestionUpdate
-from app.models.models import Question
-from app.services.services import QuestionService
+from app.db.replicas import get_read_db
+from app.utils.pagination import decode_cursor
+from app.utils.entity_cache import entity_cache
+from app.utils.serialization import trusted_response
+from app.api.deps import CurrentUser, get_current_user, get_current_moderator
+from app.schemas.schemas import (
+    VoteResponse, QuestionCreate, QuestionResponse, QuestionUpdate, QuestionPage, QuestionDetail
+)
+from app.models.models import ReactionType, Question
+from app.services.services import QuestionService, VoteService
 
 router = APIRouter()
 
 @router.post("/", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
-def create_question(question: QuestionCreate, author_id: int = Query(...), db: Session = Depends(get_db)):
+async def create_question(question: QuestionCreate, current_user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Create a new question."""
     service = QuestionService(db)
     try:
-        return service.create_question(question, author_id)
+        return trusted_response(
+            await service.create_question(question, current_user.id), status.HTTP_201_CREATED
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-@router.get("/", response_model=list[QuestionResponse])
-def get_questions(
+CURSOR_DESCRIPTION = (
+    "Opaque keyset cursor. Pass an empty value for the first page, then the "
+    "returned next_cursor; the response becomes {items, next_cursor} and skip is ignored."
+)
+
+@router.get("/", response_model=Union[list[QuestionResponse], QuestionPage])
+async def get_questions(
     skip: int = 0,
     limit: int = 20,
     category_id: int = Query(None),
+    tag: str = Query(None),
     search: str = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get questions with optional filtering and search."""
     service = QuestionService(db)
     
+    if cursor is not None and not search:
+        try:
+            return trusted_response(await service.get_questions_page(cursor, limit, category_id, tag))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
     if search:
-        return service.search_questions(search, skip, limit)
+        questions = await service.search_questions(search, skip, limit)
     elif category_id:
-        return service.get_questions_by_category(category_id, skip, limit)
+        questions = await service.get_questions_by_category(category_id, skip, limit, tag)
     else:
-        questions = db.query(Question).offset(skip).limit(limit).all()
-        return [service._format_question(q) for q in questions]
+        questions = await service.get_questions(skip, limit, tag)
+    return trusted_response(questions)
 
 @router.get("/featured", response_model=list[QuestionResponse])
-def get_featured_questions(db: Session = Depends(get_db)):
+async def get_featured_questions(db: AsyncSession = Depends(get_read_db)):
     """Get featured questions."""
     service = QuestionService(db)
-    questions = db.query(Question).filter(Question.is_featured == True).all()
-    return [service._format_question(q) for q in questions]
+    return trusted_response(await service.get_featured_questions())
+
+@router.get("/hot", response_model=list[QuestionResponse])
+async def get_hot_questions(skip: int = 0, limit: int = Query(20, le=100), db: AsyncSession = Depends(get_read_db)):
+    """Get the hot questions feed: recent questions ranked by votes, answers and views."""
+    service = QuestionService(db)
+    return trusted_response(await service.get_hot_questions(skip, limit))
 
 @router.get("/recent", response_model=list[QuestionResponse])
-def get_recent_questions(limit: int = 10, db: Session = Depends(get_db)):
+async def get_recent_questions(limit: int = 10, db: AsyncSession = Depends(get_read_db)):
     """Get recently created questions."""
     service = QuestionService(db)
-    return service.get_recent_questions(limit)
+    return trusted_response(await service.get_recent_questions(limit))
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_questions(current_user: CurrentUser = Depends(get_current_moderator)):
+    """Stream every question with its answers and comments as NDJSON (moderators only)."""
+    return StreamingResponse(export_ndjson(), media_type="application/x-ndjson")
 
 @router.get("/{question_id}", response_model=QuestionResponse)
-def get_question(question_id: int, db: Session = Depends(get_db)):
+async def get_question(question_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get question by ID."""
     service = QuestionService(db)
     try:
-        return service.get_question(question_id)
+        return trusted_response(await service.get_question(question_id))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+@router.get("/{question_id}/full", response_model=QuestionDetail)
+async def get_question_detail(
+    question_id: int,
+    cursor: str = Query("", description="next_cursor of the previous answers page"),
+    limit: int = Query(20, ge=1, le=100),
+    comments_limit: int = Query(20, ge=0, le=100, description="Comments per question or answer"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a question with a page of answers, comments on both and their authors."""
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    service = QuestionService(db)
+    try:
+        return trusted_response(await service.get_question_detail(question_id, cursor, limit, comments_limit))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,96 +127,99 @@ def get_question(question_id: int, db: Session = Depends(get_db)):
         )
 
 @router.put("/{question_id}", response_model=QuestionResponse)
-def update_question(
+async def update_question(
     question_id: int,
     question_update: QuestionUpdate,
-    author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a question."""
-    question = db.query(Question).filter(Question.id == question_id).first()
-    
-    if not question:
+    service = QuestionService(db)
+    try:
+        return trusted_response(await service.update_question(question_id, question_update, current_user.id))
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Question not found"
+            detail=str(e)
         )
-    
-    if question.author_id != author_id:
+    except PermissionError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only edit your own questions"
+            detail=str(e)
         )
-    
-    # Update fields
-    if question_update.title:
-        question.title = question_update.title
-    if question_update.description:
-        question.description = question_update.description
-    if question_update.category_id:
-        question.category_id = question_update.category_id
-    if question_update.tags:
-        question.tags = question_update.tags
-    
-    db.commit()
-    db.refresh(question)
-    
-    service = QuestionService(db)
-    return service._format_question(question)
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_question(
+async def delete_question(
     question_id: int,
-    author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a question."""
-    question = db.query(Question).filter(Question.id == question_id).first()
-    
-    if not question:
+    service = QuestionService(db)
+    try:
+        await service.delete_question(question_id, current_user.id)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Question not found"
+            detail=str(e)
         )
-    
-    if question.author_id != author_id:
+    except PermissionError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only delete your own questions"
+            detail=str(e)
         )
-    
-    db.delete(question)
-    db.commit()
     return None
 
-@router.post("/{question_id}/upvote", status_code=status.HTTP_200_OK)
-def upvote_question(
+@router.post("/{question_id}/upvote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def upvote_question(
     question_id: int,
-    user_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Upvote a question."""
-    question = db.query(Question).filter(Question.id == question_id).first()
-    
-    if not question:
+    return await _cast_vote(db, current_user.id, question_id, ReactionType.UPVOTE)
+
+@router.post("/{question_id}/downvote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def downvote_question(
+    question_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Downvote a question."""
+    return await _cast_vote(db, current_user.id, question_id, ReactionType.DOWNVOTE)
+
+@router.delete("/{question_id}/vote", response_model=VoteResponse, status_code=status.HTTP_200_OK)
+async def retract_question_vote(
+    question_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Withdraw a vote on a question."""
+    return await _cast_vote(db, current_user.id, question_id, None)
+
+async def _cast_vote(db: AsyncSession, user_id: int, question_id: int, vote_type):
+    service = VoteService(db)
+    try:
+        return await service.vote(user_id, "question", question_id, vote_type)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Question not found"
+            detail=str(e)
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
         )
-    
-    question.vote_count += 1
-    db.commit()
-    
-    return {"vote_count": question.vote_count}
 
 @router.post("/{question_id}/resolve", status_code=status.HTTP_200_OK)
-def resolve_question(
+async def resolve_question(
     question_id: int,
-    author_id: int = Query(...),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark question as resolved."""
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.get(Question, question_id)
     
     if not question:
         raise HTTPException(
@@ -161,13 +227,14 @@ def resolve_question(
             detail="Question not found"
         )
     
-    if question.author_id != author_id:
+    if question.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the question author can resolve it"
         )
     
     question.is_resolved = True
-    db.commit()
+    await db.commit()
+    await entity_cache.bump("question", question_id)
     
     return {"is_resolved": question.is_resolved}
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.replicas import get_read_db
+from app.utils.serialization import trusted_response
+from app.schemas.schemas import TagResponse
+from app.services.services import TagService
+
+router = APIRouter()
+
+@router.get("/", response_model=list[TagResponse])
+async def get_tags(
+    skip: int = 0,
+    limit: int = 50,
+    prefix: str = Query(None, max_length=50),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get tags, most used first, optionally filtered by name prefix."""
+    service = TagService(db)
+    return trusted_response(await service.get_tags(skip, limit, prefix))
@@ -1,35 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.schemas.schemas import UserCreate, UserResponse, Token
-from app.services.services import UserService
-from app.utils.security import verify_password, create_access_token
+from app.db.replicas import get_read_db
+from app.utils.serialization import trusted_response
+from app.api.questions import CURSOR_DESCRIPTION
+from app.schemas.schemas import (
+    UserCreate, UserResponse, UserPage, Token, QuestionResponse, QuestionPage, AnswerResponse, ReputationEventPage,
+    LeaderboardEntry, UserRank
+)
+from app.services.services import UserService, QuestionService, AnswerService
+from app.utils.security import create_access_token, PasswordHasherBusy
 from app.models.models import User
 from datetime import timedelta
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     service = UserService(db)
     try:
-        created_user = service.create_user(user)
+        created_user = await service.create_user(user)
         # Fetch full user object for response
-        db_user = db.query(User).filter(User.email == user.email).first()
+        db_user = await service.repository.get_user_by_email(user.email)
         return db_user
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherBusy as e:
+        raise _busy(e)
 
 @router.post("/login", response_model=Token)
-def login(email: str, password: str, db: Session = Depends(get_db)):
+async def login(email: str, password: str, db: AsyncSession = Depends(get_db)):
     """Login user and get access token."""
-    user = db.query(User).filter(User.email == email).first()
+    service = UserService(db)
+    try:
+        user = await service.authenticate(email, password)
+    except PasswordHasherBusy as e:
+        raise _busy(e)
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -49,10 +62,27 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
         "user": user
     }
 
+def _busy(e: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
+
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    country: Optional[str] = Query(None, description="Rank only users from this country"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get top contributors by reputation, overall or within one country."""
+    return trusted_response(await UserService(db).get_leaderboard(skip, limit, country))
+
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,50 +90,69 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
         )
     return user
 
-@router.get("/", response_model=list[UserResponse])
-def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=Union[list[UserResponse], UserPage])
+async def get_users(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all users with pagination."""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    service = UserService(db)
+    if cursor is not None:
+        try:
+            return await service.get_users_page(cursor, limit)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return await service.repository.get_all_users(skip, limit)
 
-@router.get("/{user_id}/questions")
-def get_user_questions(user_id: int, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+@router.get("/{user_id}/questions", response_model=Union[list[QuestionResponse], QuestionPage])
+async def get_user_questions(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get questions by a specific user."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    from app.models.models import Question
-    questions = db.query(Question).filter(
-        Question.author_id == user_id
-    ).offset(skip).limit(limit).all()
-    
-    return questions
+    service = QuestionService(db)
+    if cursor is not None:
+        try:
+            return trusted_response(await service.get_author_questions_page(user_id, cursor, limit))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return trusted_response(await service.get_questions_by_author(user_id, skip, limit))
 
-@router.get("/{user_id}/answers")
-def get_user_answers(user_id: int, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+@router.get("/{user_id}/answers", response_model=list[AnswerResponse])
+async def get_user_answers(user_id: int, skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_read_db)):
     """Get answers by a specific user."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    from app.models.models import Answer
-    answers = db.query(Answer).filter(
-        Answer.author_id == user_id
-    ).offset(skip).limit(limit).all()
-    
-    return answers
+    service = AnswerService(db)
+    return trusted_response(await service.get_author_answers(user_id, skip, limit))
 
 @router.get("/{user_id}/reputation")
-def get_user_reputation(user_id: int, db: Session = Depends(get_db)):
+async def get_user_reputation(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get user reputation score."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,3 +164,41 @@ def get_user_reputation(user_id: int, db: Session = Depends(get_db)):
         "username": user.username,
         "reputation_score": user.reputation_score
     }
+
+@router.get("/{user_id}/rank", response_model=UserRank)
+async def get_user_rank(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a user's reputation rank overall and within their country."""
+    rank = await UserService(db).get_user_rank(user_id)
+    if rank is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return rank
+
+@router.get("/{user_id}/reputation/events", response_model=ReputationEventPage)
+async def get_user_reputation_events(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query("", description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the ledger behind a user's reputation score, newest first.
+    
+    Events with folded false are not yet included in reputation_score.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    try:
+        return await UserService(db).get_reputation_events_page(user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
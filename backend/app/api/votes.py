@@ -0,0 +1,22 @@
+from typing import List
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import CurrentUser, get_current_moderator
+from app.db.database import get_db
+from app.schemas.schemas import VoteCreate, VoteBatchResponse
+from app.services.services import VoteService
+
+router = APIRouter()
+
+@router.post("/bulk", response_model=VoteBatchResponse, status_code=status.HTTP_200_OK)
+async def ingest_votes(
+    votes: List[VoteCreate],
+    current_user: CurrentUser = Depends(get_current_moderator),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply a batch of votes on behalf of their users, coalescing counter
+    updates per question/answer (moderators only: the batch names its voters).
+    """
+    service = VoteService(db)
+    return await service.ingest_votes(votes)
@@ -0,0 +1,72 @@
+"""
+Bulk export and import of questions with their answers and comments as NDJSON.
+
+    python -m app.db.bulk export > questions.ndjson
+    python -m app.db.bulk import questions.ndjson [--batch-size 1000]
+
+One question per line, answers and comments nested (the format of
+GET /api/v1/questions/export). Export streams from a server-side cursor;
+import writes fresh rows in batches with executemany INSERTs, or COPY on
+Postgres, and keeps the counter columns and search index in step.
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, Iterator
+import orjson
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.repositories.bulk import BulkRepository
+
+# Bytes of NDJSON collected before a chunk is handed to the writer
+CHUNK_SIZE = 64 * 1024
+
+async def export_ndjson(batch_size: int = settings.BULK_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """Yield the NDJSON export in chunks of about CHUNK_SIZE bytes."""
+    async with SessionLocal() as db:
+        chunk = bytearray()
+        async for record in BulkRepository(db).export_questions(batch_size):
+            chunk += orjson.dumps(record)
+            chunk += b"\n"
+            if len(chunk) >= CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+
+def read_ndjson(stream) -> Iterator[dict]:
+    """Parse NDJSON records from a binary stream, skipping blank lines."""
+    for line in stream:
+        if line.strip():
+            yield orjson.loads(line)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import questions as NDJSON.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", nargs="?", default="-", help="file to read or write; - for stdin/stdout")
+    parser.add_argument("--batch-size", type=int, default=settings.BULK_BATCH_SIZE,
+                        help="rows per cursor fetch / import transaction")
+    args = parser.parse_args()
+    
+    if args.command == "export":
+        out = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+        try:
+            async for chunk in export_ndjson(args.batch_size):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+    else:
+        source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        try:
+            async with SessionLocal() as db:
+                counts = await BulkRepository(db).import_questions(read_ndjson(source), args.batch_size)
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+        print(", ".join(f"{count} {name}" for name, count in sorted(counts.items())) or "Nothing imported",
+              file=sys.stderr)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from sqlalchemy import Column, bindparam
+from app.core.config import settings
+from app.db.database import engine
+from app.models.models import Question
+
+logger = logging.getLogger(__name__)
+
+class BufferedCounter:
+    """
+    Write-behind accumulator for an integer counter column.
+    
+    Increments are coalesced per row in memory and written as one batched
+    UPDATE ... SET col = col + :amount, either every flush_interval seconds
+    or as soon as flush_threshold distinct rows are pending. Counts are
+    additive, so several worker processes can each run their own buffer.
+    """
+    
+    def __init__(self, name: str, column: Column, flush_interval: float, flush_threshold: int):
+        self.name = name
+        self.column = column
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        table = column.table
+        self._statement = (
+            table.update()
+            .where(table.c.id == bindparam("row_id"))
+            .values({column.name: column + bindparam("amount")})
+        )
+        self._pending: Dict[int, int] = {}
+        self._oldest_pending: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Metrics
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rows_flushed = 0
+        self.increments_flushed = 0
+        self.last_flush_rows = 0
+        self.last_flush_lag = 0.0
+        self.max_flush_lag = 0.0
+    
+    def add(self, row_id: int, amount: int = 1) -> None:
+        """Record an increment; never touches the database."""
+        if not self._pending:
+            self._oldest_pending = time.monotonic()
+        self._pending[row_id] = self._pending.get(row_id, 0) + amount
+        if len(self._pending) >= self.flush_threshold:
+            self._wakeup.set()
+    
+    def pending(self, row_id: int) -> int:
+        """Increments for row_id that have not been written yet."""
+        return self._pending.get(row_id, 0)
+    
+    async def flush(self) -> int:
+        """Write all pending increments in one transaction. Returns rows updated."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            oldest, self._oldest_pending = self._oldest_pending, None
+            # Sorted ids give every worker the same lock order
+            params = [
+                {"row_id": row_id, "amount": amount}
+                for row_id, amount in sorted(batch.items())
+                if amount
+            ]
+            if params:
+                try:
+                    async with engine.begin() as conn:
+                        await conn.execute(self._statement, params)
+                except Exception:
+                    logger.exception("Flushing %s counter failed; keeping %d rows pending", self.name, len(params))
+                    self.failed_flushes += 1
+                    for row_id, amount in batch.items():
+                        self._pending[row_id] = self._pending.get(row_id, 0) + amount
+                    self._oldest_pending = min(oldest, self._oldest_pending or oldest)
+                    return 0
+            lag = time.monotonic() - oldest
+            self.flushes += 1
+            self.rows_flushed += len(params)
+            self.increments_flushed += sum(p["amount"] for p in params)
+            self.last_flush_rows = len(params)
+            self.last_flush_lag = lag
+            self.max_flush_lag = max(self.max_flush_lag, lag)
+            return len(params)
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    def start(self) -> None:
+        """Start the periodic flush loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    def stats(self) -> dict:
+        """Flush size and lag metrics."""
+        return {
+            "name": self.name,
+            "pending_rows": len(self._pending),
+            "pending_increments": sum(self._pending.values()),
+            "oldest_pending_age_seconds": (
+                time.monotonic() - self._oldest_pending if self._pending else 0.0
+            ),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rows_flushed": self.rows_flushed,
+            "increments_flushed": self.increments_flushed,
+            "last_flush_rows": self.last_flush_rows,
+            "last_flush_lag_seconds": self.last_flush_lag,
+            "max_flush_lag_seconds": self.max_flush_lag,
+            "flush_interval_seconds": self.flush_interval,
+            "flush_threshold": self.flush_threshold
+        }
+
+# Question page views, flushed in bulk instead of one UPDATE + COMMIT per GET
+question_views = BufferedCounter(
+    "question_views",
+    Question.__table__.c.view_count,
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL,
+    flush_threshold=settings.VIEW_COUNT_FLUSH_THRESHOLD
+)
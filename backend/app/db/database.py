@@ -1,29 +1,68 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, pool_metrics
+from app.db.profiling import sql_profiler
+
+# Async drivers for the URL schemes we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver in a database URL for its async counterpart."""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+def engine_options(url: str) -> dict:
+    """
+    create_async_engine keyword arguments from settings.
+    
+    SQLite keeps SQLAlchemy's default pool (one connection per checkout);
+    everything else gets a sized, pre-pinged, instrumented queue pool.
+    Postgres sessions also get a server-side statement_timeout.
+    """
+    options = {"echo": settings.DB_ECHO, "future": True}
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    return options
+
+DATABASE_URL = to_async_url(settings.DATABASE_URL)
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=True,  # Set to False in production
-    future=True
-)
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+pool_metrics.attach(engine.sync_engine.pool)
+sql_profiler.attach(engine.sync_engine)
 
-# Create session factory
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
+# Create session factory. Objects stay loaded after commit so that reading
+# attributes never triggers implicit I/O outside an await.
+SessionLocal = async_sessionmaker(
     bind=engine,
-    future=True
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
 # Base class for all models
 Base = declarative_base()
 
-def get_db():
+async def get_db():
     """Dependency for getting database session."""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,30 @@
+"""
+Create the database schema and the question search index.
+
+    python -m app.db.init_db
+
+Run it once per database and again after deploys that add tables; it is
+idempotent. The API no longer creates tables when it starts, so worker
+boot does no schema introspection. Columns added to existing tables are
+handled by their own scripts (app.db.migrate_tags, app.db.reconcile).
+"""
+import asyncio
+from app.db.database import Base, engine
+import app.models.models  # registers every table on Base.metadata
+from app.repositories.search import get_search_backend
+
+async def init_db() -> str:
+    """Create missing tables and search index structures; returns the search backend name."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    search = get_search_backend()
+    await search.setup(engine)
+    return search.name
+
+async def main() -> None:
+    search = await init_db()
+    await engine.dispose()
+    print(f"Schema is up to date (search backend: {search})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
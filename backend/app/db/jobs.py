@@ -0,0 +1,395 @@
+"""
+Background jobs for side effects that a request does not wait for.
+
+    python -m app.db.jobs prune
+
+Writes commit their own rows and then enqueue the follow-up work, such as
+counters on the author, category and tags of a new question, as a named
+job with a JSON-able payload. JOB_BACKEND picks where jobs run:
+
+- "memory": worker tasks on each API process's event loop. Jobs still
+  queued when the process stops are run before it exits; a crash loses
+  them (once every API process is stopped, python -m app.db.reconcile
+  repairs the counters).
+- "rq": an RQ queue on REDIS_URL, run by separate worker processes
+  (rq worker --with-scheduler --url $REDIS_URL jobs). If Redis refuses a
+  job, it runs in-process instead.
+
+Every job runs in one transaction together with the insert of its
+idempotency key into completed_jobs, so a retry, or a job delivered
+twice, applies its effects once. Failed jobs are retried JOB_MAX_ATTEMPTS
+times in all with exponential backoff. prune deletes keys older than
+JOB_KEY_RETENTION_HOURS; the API's job queue also does it hourly.
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.db.database import engine
+from app.db.reconcile import COUNTERS, counter_name
+from app.models.models import CompletedJob
+from app.utils.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+completed_jobs = CompletedJob.__table__
+
+COUNTER_COLUMNS = {counter_name(spec): (spec.model.__table__, spec.column) for spec in COUNTERS}
+
+async def apply_counters(conn: AsyncConnection, payload: dict) -> None:
+    """
+    Add {"<table>.<column>": {row_id: delta}} to denormalised counters.
+    
+    One batched UPDATE per counter, counters in a fixed order and rows in
+    id order, so concurrent jobs lock rows in the same sequence.
+    """
+    for name in COUNTER_COLUMNS:
+        deltas = payload.get(name)
+        if not deltas:
+            continue
+        table, column = COUNTER_COLUMNS[name]
+        params = [
+            {"row_id": row_id, "delta": delta}
+            for row_id, delta in sorted((int(row_id), delta) for row_id, delta in deltas.items())
+            if delta
+        ]
+        if params:
+            await conn.execute(
+                table.update()
+                .where(table.c.id == bindparam("row_id"))
+                .values({column: table.c[column] + bindparam("delta")}),
+                params
+            )
+
+# LocalCache names holding a counter's value, by counter
+COUNTER_CACHES = {
+    "categories.question_count": ["categories"],
+}
+
+def invalidate_counter_caches(payload: dict) -> None:
+    """
+    Drop this process's cached reads of counters a committed job changed.
+    
+    Only caches in the process that ran the job are reached: with
+    JOB_BACKEND=rq, API processes see the new counts once their own
+    entries expire.
+    """
+    for name, cache_names in COUNTER_CACHES.items():
+        if any((payload.get(name) or {}).values()):
+            for cache_name in cache_names:
+                cache = LocalCache.registry.get(cache_name)
+                if cache is not None:
+                    cache.invalidate()
+
+# Job name -> handler, run inside the job's transaction
+JOB_HANDLERS: Dict[str, Callable[[AsyncConnection, dict], Awaitable[None]]] = {
+    "counters": apply_counters,
+}
+
+# Job name -> callback run after the job's transaction commits
+JOB_COMMITTED: Dict[str, Callable[[dict], None]] = {
+    "counters": invalidate_counter_caches,
+}
+
+async def execute_job(name: str, payload: dict, key: str) -> bool:
+    """Run a job unless its key has completed; returns False for a duplicate."""
+    handler = JOB_HANDLERS[name]
+    async with engine.begin() as conn:
+        done = await conn.execute(select(completed_jobs.c.key).where(completed_jobs.c.key == key))
+        if done.first() is not None:
+            return False
+        # A concurrent run of the same key fails on the primary key and retries
+        await conn.execute(completed_jobs.insert().values(key=key, name=name, completed_at=datetime.utcnow()))
+        await handler(conn, payload)
+    committed = JOB_COMMITTED.get(name)
+    if committed is not None:
+        committed(payload)
+    return True
+
+def run_job(name: str, payload: dict, key: str) -> bool:
+    """Entry point for RQ workers: run one job on a fresh event loop."""
+    async def run():
+        try:
+            return await execute_job(name, payload, key)
+        finally:
+            # The pool's connections belong to this loop
+            await engine.dispose()
+    return asyncio.run(run())
+
+async def prune_completed(retention_hours: float) -> int:
+    """Delete idempotency keys older than retention_hours; returns keys deleted."""
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    async with engine.begin() as conn:
+        result = await conn.execute(completed_jobs.delete().where(completed_jobs.c.completed_at < cutoff))
+    return result.rowcount
+
+class Job(NamedTuple):
+    name: str
+    payload: dict
+    key: str
+    attempts: int
+    enqueued_at: float
+
+class JobQueue:
+    """
+    In-process job queue: worker tasks on the running event loop.
+    
+    enqueue() only appends to an asyncio.Queue, so the request returns
+    without waiting for the job. A failed job is put back after
+    retry_backoff * 2^attempts seconds until max_attempts runs have
+    failed, then logged and dropped. Before start() (scripts, the CLI)
+    jobs run inline.
+    """
+    
+    PRUNE_INTERVAL = 3600.0  # seconds
+    
+    def __init__(self, workers: int, max_attempts: int, retry_backoff: float, key_retention_hours: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.key_retention_hours = key_retention_hours
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._delayed: Dict[int, tuple] = {}
+        self._delay_ids = 0
+        self._stopping = False
+        
+        # Metrics
+        self.enqueued = 0
+        self.completed = 0
+        self.duplicates = 0
+        self.retried = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.last_lag_seconds = 0.0
+        self.keys_pruned = 0
+    
+    async def enqueue(self, name: str, payload: dict, key: Optional[str] = None) -> str:
+        """
+        Queue a job; call after the transaction it follows has committed.
+        
+        Each call gets a new idempotency key unless one is given; pass one
+        only if it can never name a different event (row ids can be reused
+        after deletes). Returns the key.
+        """
+        if name not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job {name}")
+        job = Job(name, payload, key or uuid.uuid4().hex, 0, time.time())
+        self.enqueued += 1
+        if self._queue is None:
+            await self._attempt(job)
+        else:
+            self._queue.put_nowait(job)
+        return job.key
+    
+    async def _attempt(self, job: Job) -> None:
+        self.in_flight += 1
+        try:
+            ran = await execute_job(job.name, job.payload, job.key)
+        except Exception:
+            attempts = job.attempts + 1
+            if attempts >= self.max_attempts or self._queue is None or self._stopping:
+                logger.exception("Job %s (%s) failed after %d attempts", job.name, job.key, attempts)
+                self.failed += 1
+                return
+            logger.warning("Job %s (%s) failed, retrying", job.name, job.key, exc_info=True)
+            self.retried += 1
+            self._retry_later(job._replace(attempts=attempts), self.retry_backoff * 2 ** job.attempts)
+            return
+        finally:
+            self.in_flight -= 1
+        if ran:
+            self.completed += 1
+        else:
+            self.duplicates += 1
+        self.last_lag_seconds = time.time() - job.enqueued_at
+    
+    def _retry_later(self, job: Job, delay: float) -> None:
+        self._delay_ids += 1
+        delay_id = self._delay_ids
+        
+        def release():
+            _, waiting = self._delayed.pop(delay_id)
+            self._queue.put_nowait(waiting)
+        
+        self._delayed[delay_id] = (asyncio.get_running_loop().call_later(delay, release), job)
+    
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._attempt(job)
+            finally:
+                self._queue.task_done()
+    
+    async def _maintain(self) -> None:
+        while True:
+            try:
+                self.keys_pruned += await prune_completed(self.key_retention_hours)
+            except Exception:
+                logger.exception("Pruning completed job keys failed")
+            await asyncio.sleep(self.PRUNE_INTERVAL)
+    
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._stopping = False
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+            self._tasks.append(asyncio.create_task(self._maintain()))
+    
+    async def stop(self) -> None:
+        """Run every queued job (waiting retries at once, without further retries), then stop the workers."""
+        if self._queue is None:
+            return
+        self._stopping = True
+        for handle, job in self._delayed.values():
+            handle.cancel()
+            self._queue.put_nowait(job)
+        self._delayed.clear()
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+    
+    def stats(self) -> dict:
+        """Queue depth, outcomes and the enqueue-to-completion lag of the last job."""
+        return {
+            "backend": "memory",
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "waiting_retry": len(self._delayed),
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "duplicates": self.duplicates,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_lag_seconds": self.last_lag_seconds,
+            "keys_pruned": self.keys_pruned,
+            "workers": self.workers,
+            "max_attempts": self.max_attempts
+        }
+
+class RQJobQueue(JobQueue):
+    """
+    Job queue on RQ: jobs go to a Redis list and separate worker processes
+    run them through run_job(), with RQ's own retries.
+    
+    The in-process workers still start, for jobs Redis refuses and for
+    pruning keys. Queue depth is read from Redis every sample_interval
+    seconds. Needs the rq package.
+    """
+    
+    def __init__(self, url: str, queue_name: str, sample_interval: float, **options):
+        super().__init__(**options)
+        try:
+            from redis import Redis
+            from rq import Queue, Retry
+        except ImportError as e:
+            raise RuntimeError("JOB_BACKEND=rq needs the rq package installed") from e
+        self.sample_interval = sample_interval
+        self.rq_queue = Queue(queue_name, connection=Redis.from_url(url))
+        self.rq_retry = None
+        if self.max_attempts > 1:
+            self.rq_retry = Retry(
+                max=self.max_attempts - 1,
+                interval=[int(self.retry_backoff * 2 ** attempt) for attempt in range(self.max_attempts - 1)]
+            )
+        self.rq_enqueued = 0
+        self.rq_fallbacks = 0
+        self.rq_depth: Optional[int] = None
+        self.rq_failed: Optional[int] = None
+    
+    async def enqueue(self, name: str, payload: dict, key: Optional[str] = None) -> str:
+        if name not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job {name}")
+        key = key or uuid.uuid4().hex
+        try:
+            # redis-py is blocking; keep the event loop free
+            await asyncio.to_thread(
+                self.rq_queue.enqueue, run_job, name, payload, key,
+                retry=self.rq_retry, description=f"{name} {key}"
+            )
+        except Exception as e:
+            logger.warning("Enqueueing job %s on RQ failed, running it in-process: %s", key, e)
+            self.rq_fallbacks += 1
+            return await super().enqueue(name, payload, key)
+        self.rq_enqueued += 1
+        return key
+    
+    def outstanding(self) -> int:
+        """Jobs queued, running or waiting for a retry on RQ; reads Redis."""
+        return (
+            self.rq_queue.count
+            + self.rq_queue.started_job_registry.count
+            + self.rq_queue.scheduled_job_registry.count
+        )
+    
+    def _sample(self) -> None:
+        self.rq_depth = self.rq_queue.count
+        self.rq_failed = self.rq_queue.failed_job_registry.count
+    
+    async def _maintain(self) -> None:
+        last_prune = 0.0
+        while True:
+            try:
+                await asyncio.to_thread(self._sample)
+            except Exception as e:
+                logger.warning("Reading RQ queue depth failed: %s", e)
+                self.rq_depth = self.rq_failed = None
+            if time.monotonic() - last_prune >= self.PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                try:
+                    self.keys_pruned += await prune_completed(self.key_retention_hours)
+                except Exception:
+                    logger.exception("Pruning completed job keys failed")
+            await asyncio.sleep(self.sample_interval)
+    
+    def stats(self) -> dict:
+        """In-process stats plus RQ depth, failed-job registry size and fallbacks."""
+        return {
+            **super().stats(),
+            "backend": "rq",
+            "rq_queue": self.rq_queue.name,
+            "rq_queued": self.rq_depth,
+            "rq_failed": self.rq_failed,
+            "rq_enqueued": self.rq_enqueued,
+            "rq_fallbacks": self.rq_fallbacks
+        }
+
+def create_job_queue(backend: str) -> JobQueue:
+    """Pick a job queue by name."""
+    options = {
+        "workers": settings.JOB_WORKERS,
+        "max_attempts": settings.JOB_MAX_ATTEMPTS,
+        "retry_backoff": settings.JOB_RETRY_BACKOFF,
+        "key_retention_hours": settings.JOB_KEY_RETENTION_HOURS,
+    }
+    if backend == "memory":
+        return JobQueue(**options)
+    if backend == "rq":
+        return RQJobQueue(settings.REDIS_URL, settings.JOB_RQ_QUEUE, settings.METRICS_SAMPLE_INTERVAL, **options)
+    raise ValueError(f"Unknown job backend {backend}")
+
+# Process-wide queue, started by the app lifespan
+job_queue = create_job_queue(settings.JOB_BACKEND)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the background job tables.")
+    parser.add_argument("command", choices=["prune"])
+    parser.add_argument("--retention-hours", type=float, default=settings.JOB_KEY_RETENTION_HOURS)
+    args = parser.parse_args()
+    
+    print(f"{await prune_completed(args.retention_hours)} completed job keys pruned")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Backfill question_tags from the legacy comma-separated questions.tags column.
+
+Run once after deploying the tag tables:
+
+    python -m app.db.migrate_tags [--drop-column]
+
+The backfill is idempotent; usage counts are recomputed from the
+association table at the end. --drop-column removes questions.tags
+afterwards.
+"""
+import asyncio
+import logging
+import sys
+from sqlalchemy import inspect, select, text, func, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.db.database import engine
+from app.models.models import Tag, question_tags
+from app.repositories.repositories import parse_tags
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+async def _legacy_column_exists(conn: AsyncConnection) -> bool:
+    columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns("questions"))
+    return any(column["name"] == "tags" for column in columns)
+
+async def _tag_ids(conn: AsyncConnection, names: set) -> dict:
+    """Map tag names to ids, inserting the missing tags."""
+    rows = await conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+    ids = dict(rows.all())
+    missing = sorted(names - set(ids))
+    if missing:
+        await conn.execute(Tag.__table__.insert(), [{"name": name, "usage_count": 0} for name in missing])
+        rows = await conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))
+        ids.update(rows.all())
+    return ids
+
+async def backfill_question_tags(conn: AsyncConnection) -> int:
+    """Copy legacy tag strings into question_tags; returns associations added."""
+    await conn.run_sync(
+        lambda sync_conn: Tag.metadata.create_all(sync_conn, tables=[Tag.__table__, question_tags])
+    )
+    if not await _legacy_column_exists(conn):
+        logger.info("questions.tags does not exist; nothing to backfill")
+        return 0
+    
+    added = 0
+    last_id = 0
+    while True:
+        rows = (await conn.execute(text(
+            "SELECT id, tags FROM questions "
+            "WHERE id > :last_id AND tags IS NOT NULL AND tags != '' "
+            "ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BATCH_SIZE})).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        
+        wanted = {question_id: parse_tags(tags) for question_id, tags in rows}
+        tag_ids = await _tag_ids(conn, {name for names in wanted.values() for name in names})
+        existing = set((await conn.execute(
+            select(question_tags.c.question_id, question_tags.c.tag_id)
+            .where(question_tags.c.question_id.in_(list(wanted)))
+        )).all())
+        params = [
+            {"question_id": question_id, "tag_id": tag_ids[name]}
+            for question_id, names in wanted.items()
+            for name in names
+            if (question_id, tag_ids[name]) not in existing
+        ]
+        if params:
+            await conn.execute(question_tags.insert(), params)
+            added += len(params)
+    
+    usage = (
+        select(func.count())
+        .select_from(question_tags)
+        .where(question_tags.c.tag_id == Tag.id)
+        .scalar_subquery()
+    )
+    await conn.execute(update(Tag).values(usage_count=usage))
+    return added
+
+async def drop_legacy_column(conn: AsyncConnection) -> None:
+    """Drop questions.tags once the backfill has run."""
+    if await _legacy_column_exists(conn):
+        await conn.execute(text("ALTER TABLE questions DROP COLUMN tags"))
+
+async def main(drop_column: bool = False) -> None:
+    async with engine.begin() as conn:
+        added = await backfill_question_tags(conn)
+        if drop_column:
+            await drop_legacy_column(conn)
+    await engine.dispose()
+    print(f"Backfilled {added} question tag associations")
+
+if __name__ == "__main__":
+    asyncio.run(main(drop_column="--drop-column" in sys.argv[1:]))
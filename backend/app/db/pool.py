@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+class PoolMetrics:
+    """
+    Connection pool counters for sizing workers against max_connections.
+    
+    Checkouts, checkins and invalidations come from pool events; wait time
+    and timeouts are recorded by InstrumentedQueuePool into the metrics
+    attached to that pool, so they are only available for pooled
+    (non-SQLite) engines. Each engine's pool needs its own instance.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+    
+    def attach(self, pool: Pool) -> None:
+        """Count connects, checkouts, checkins and invalidations on pool, and its waits if instrumented."""
+        pool.metrics = self
+        
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+        
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+                self.max_checked_out = max(self.max_checked_out, self.checked_out)
+        
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+                self.checked_out = max(self.checked_out - 1, 0)
+        
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+    
+    def stats(self, pool: Pool) -> dict:
+        """Counters plus the pool's current size and overflow."""
+        queue_pool = isinstance(pool, AsyncAdaptedQueuePool)
+        return {
+            "pool_class": type(pool).__name__,
+            "pool_size": pool.size() if queue_pool else None,
+            "max_overflow": pool._max_overflow if queue_pool else None,
+            "overflow": max(pool.overflow(), 0) if queue_pool else None,
+            "idle": pool.checkedin() if queue_pool else None,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "waits": self.waits,
+            "wait_seconds_total": self.wait_seconds_total,
+            "avg_wait_seconds": self.wait_seconds_total / self.waits if self.waits else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "timeouts": self.timeouts
+        }
+
+# The primary engine's pool; replicas attach their own PoolMetrics
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits into its attached metrics."""
+    
+    metrics: Optional[PoolMetrics] = None
+    
+    def connect(self):
+        metrics = self.metrics
+        if metrics is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return connection
+    
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
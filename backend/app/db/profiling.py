@@ -0,0 +1,192 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _compact(statement: str, limit: int = 300) -> str:
+    """One-line, length-capped SQL for log messages."""
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+class RequestProfile:
+    """Statements one request executed, grouped by SQL text."""
+    
+    __slots__ = ("statements", "db_seconds", "shapes", "shape_seconds")
+    
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Statements are compiled with bound parameters, so identical text
+        # means the same query shape with different values
+        self.shapes: Counter = Counter()
+        self.shape_seconds: Counter = Counter()
+    
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        self.shapes[statement] += 1
+        self.shape_seconds[statement] += seconds
+    
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed at least threshold times: likely N+1 loops."""
+        return [(statement, count) for statement, count in self.shapes.most_common() if count >= threshold]
+    
+    def slowest(self, count: int) -> List[Tuple[str, float]]:
+        """Shapes with the most total DB time."""
+        return self.shape_seconds.most_common(count)
+    
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value."""
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries", '
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+# Profile of the request being handled, if it was sampled. SQLAlchemy runs
+# engine events in a greenlet that shares the calling task's context.
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+class SQLProfiler:
+    """
+    Per-request SQL statement counts and DB time from engine events.
+    
+    A sampled request gets a RequestProfile in a context variable; the
+    cursor-execute hooks return immediately for every other request, so
+    the cost outside the sample is one ContextVar lookup per statement.
+    When a request finishes, shapes repeated repeat_threshold or more
+    times are logged as likely N+1 queries, and statements slower than
+    slow_ms are logged as they complete.
+    """
+    
+    def __init__(self, sample_rate: float, repeat_threshold: int, slow_ms: float, log_slowest: int):
+        self.sample_rate = sample_rate
+        self.repeat_threshold = repeat_threshold
+        self.slow_seconds = slow_ms / 1000
+        self.log_slowest = log_slowest
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.requests = 0
+        self.statements = 0
+        self.db_seconds_total = 0.0
+        self.max_statements = 0
+        self.n_plus_one_requests = 0
+        self.slow_statements = 0
+    
+    def attach(self, engine: Engine) -> None:
+        """Time every cursor execution on engine."""
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current_profile.get() is not None:
+                conn.info.setdefault("profile_started", []).append(time.perf_counter())
+        
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            profile = _current_profile.get()
+            started = conn.info.get("profile_started")
+            if profile is None or not started:
+                return
+            elapsed = time.perf_counter() - started.pop()
+            profile.record(statement, elapsed)
+            if self.slow_seconds and elapsed >= self.slow_seconds:
+                self.slow_statements += 1
+                logger.warning("Slow SQL statement (%.1f ms): %s", elapsed * 1000, _compact(statement))
+    
+    def sampled(self) -> bool:
+        """Whether to profile the next request."""
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+    
+    def start(self) -> Tuple[RequestProfile, object]:
+        """Begin profiling the current context; returns the profile and a reset token."""
+        profile = RequestProfile()
+        return profile, _current_profile.set(profile)
+    
+    def finish(self, label: str, profile: RequestProfile, token: object) -> None:
+        """Stop profiling, fold the request into the totals and report suspect query shapes."""
+        _current_profile.reset(token)
+        repeated = profile.repeated(self.repeat_threshold)
+        with self._lock:
+            self.requests += 1
+            self.statements += profile.statements
+            self.db_seconds_total += profile.db_seconds
+            self.max_statements = max(self.max_statements, profile.statements)
+            if repeated:
+                self.n_plus_one_requests += 1
+        if repeated:
+            logger.warning(
+                "%s ran %d queries; repeated statements (likely N+1): %s",
+                label, profile.statements,
+                "; ".join(f"{count}x {_compact(statement)}" for statement, count in repeated[:3])
+            )
+        if self.log_slowest and profile.statements:
+            logger.info(
+                "%s: %d queries in %.1f ms; slowest: %s",
+                label, profile.statements, profile.db_seconds * 1000,
+                "; ".join(
+                    f"{seconds * 1000:.1f} ms {_compact(statement)}"
+                    for statement, seconds in profile.slowest(self.log_slowest)
+                )
+            )
+    
+    def stats(self) -> dict:
+        """Totals over profiled requests."""
+        return {
+            "sample_rate": self.sample_rate,
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": self.statements / self.requests if self.requests else 0.0,
+            "max_statements": self.max_statements,
+            "db_seconds_total": self.db_seconds_total,
+            "avg_db_seconds": self.db_seconds_total / self.requests if self.requests else 0.0,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "slow_statements": self.slow_statements,
+            "repeat_threshold": self.repeat_threshold
+        }
+
+class SQLProfilingMiddleware:
+    """
+    ASGI middleware that profiles a sample of HTTP requests.
+    
+    Sampled responses carry a Server-Timing header with the DB time and
+    query count up to the moment headers were sent.
+    """
+    
+    def __init__(self, app, profiler: SQLProfiler):
+        self.app = app
+        self.profiler = profiler
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.sampled():
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        profile, token = self.profiler.start()
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = profile.server_timing(time.perf_counter() - started)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            self.profiler.finish(f"{scope['method']} {getattr(route, 'path', scope['path'])}", profile, token)
+
+# Process-wide SQL profiler, attached to the engine in app.db.database
+sql_profiler = SQLProfiler(
+    sample_rate=settings.SQL_PROFILE_SAMPLE_RATE,
+    repeat_threshold=settings.SQL_PROFILE_REPEAT_THRESHOLD,
+    slow_ms=settings.SQL_PROFILE_SLOW_MS,
+    log_slowest=settings.SQL_PROFILE_LOG_SLOWEST
+)
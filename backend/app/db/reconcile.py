@@ -0,0 +1,115 @@
+"""
+Recompute denormalised counter columns from the rows they count.
+
+    python -m app.db.reconcile [--batch-size 5000] [--only users.answer_count]
+
+questions.answer_count is kept in step in the writing transaction; the
+other counters are applied by "counters" jobs after the write commits
+(app.db.jobs). This repairs drift left by manual edits, jobs lost in a
+crash or rows loaded around the ORM.
+
+Each counter is fixed with one set-based UPDATE per id range, so every
+transaction is short and only locks rows whose count is actually wrong.
+Missing counter columns are added first, which makes the command double
+as the migration for them.
+
+Run it with no counter jobs outstanding: a job still queued or waiting
+to retry would add its delta on top of the true count written here and
+recreate the drift. Stop the API processes first (the memory backend
+runs its queued jobs on shutdown); with JOB_BACKEND=rq the command also
+refuses to run while the RQ queue holds jobs, unless given --force.
+"""
+import argparse
+import asyncio
+import sys
+from typing import NamedTuple
+from sqlalchemy import inspect, select, func, text, update, and_
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.db.database import engine
+from app.models.models import User, Category, Question, Answer, Tag, question_tags
+
+class CounterSpec(NamedTuple):
+    model: type
+    column: str
+    counted: object  # table whose rows are counted
+    foreign_key: object  # column of counted pointing at model.id
+
+COUNTERS = [
+    CounterSpec(Category, "question_count", Question.__table__, Question.category_id),
+    CounterSpec(Question, "answer_count", Answer.__table__, Answer.question_id),
+    CounterSpec(User, "question_count", Question.__table__, Question.author_id),
+    CounterSpec(User, "answer_count", Answer.__table__, Answer.author_id),
+    CounterSpec(Tag, "usage_count", question_tags, question_tags.c.tag_id),
+]
+
+def counter_name(spec: CounterSpec) -> str:
+    return f"{spec.model.__tablename__}.{spec.column}"
+
+async def add_missing_columns(conn: AsyncConnection) -> list:
+    """Add counter columns that predate this schema; returns their names."""
+    added = []
+    for spec in COUNTERS:
+        table = spec.model.__tablename__
+        columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns(table))
+        if not any(column["name"] == spec.column for column in columns):
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {spec.column} INTEGER NOT NULL DEFAULT 0"))
+            added.append(counter_name(spec))
+    return added
+
+async def reconcile_counter(spec: CounterSpec, batch_size: int) -> int:
+    """Fix one counter in id-range batches; returns the number of rows corrected."""
+    model = spec.model
+    counter = getattr(model, spec.column)
+    actual = (
+        select(func.count())
+        .select_from(spec.counted)
+        .where(spec.foreign_key == model.id)
+        .scalar_subquery()
+    )
+    async with engine.connect() as conn:
+        max_id = (await conn.execute(select(func.max(model.id)))).scalar() or 0
+
+    fixed = 0
+    for low in range(1, max_id + 1, batch_size):
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                update(model)
+                .where(and_(model.id >= low, model.id < low + batch_size, counter != actual))
+                .values({spec.column: actual})
+                .execution_options(synchronize_session=False)
+            )
+            fixed += result.rowcount
+    return fixed
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute denormalised counters.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="ids per UPDATE transaction")
+    parser.add_argument("--only", action="append", choices=[counter_name(spec) for spec in COUNTERS],
+                        help="counter to reconcile (repeatable); default all")
+    parser.add_argument("--force", action="store_true", help="run even while RQ holds counter jobs")
+    args = parser.parse_args()
+
+    if settings.JOB_BACKEND == "rq" and not args.force:
+        # Imported here: app.db.jobs imports this module
+        from app.db.jobs import job_queue
+        try:
+            outstanding = await asyncio.to_thread(job_queue.outstanding)
+        except Exception as e:
+            sys.exit(f"Cannot check the RQ queue for outstanding jobs ({e}); use --force to run anyway")
+        if outstanding:
+            sys.exit(f"{outstanding} jobs are queued, running or waiting to retry on RQ; "
+                     f"run again once they finish, or use --force")
+
+    async with engine.begin() as conn:
+        for name in await add_missing_columns(conn):
+            print(f"Added column {name}")
+    for spec in COUNTERS:
+        if args.only and counter_name(spec) not in args.only:
+            continue
+        fixed = await reconcile_counter(spec, args.batch_size)
+        print(f"{counter_name(spec):24} {fixed} rows corrected")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
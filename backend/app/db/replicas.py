@@ -0,0 +1,244 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Callable, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.config import settings
+from app.db.database import SessionLocal, engine_options, to_async_url
+from app.db.pool import PoolMetrics
+from app.db.profiling import sql_profiler
+from app.utils.cache import ExpiringLRU
+
+logger = logging.getLogger(__name__)
+
+# Set on requests from clients that wrote within the sticky window
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+
+class Replica:
+    """One read replica: its engine, session factory and health."""
+    
+    def __init__(self, url: str):
+        async_url = to_async_url(url)
+        self.name = make_url(async_url).render_as_string(hide_password=True)
+        self.engine = create_async_engine(async_url, **engine_options(async_url))
+        self.pool_metrics = PoolMetrics()
+        self.pool_metrics.attach(self.engine.sync_engine.pool)
+        sql_profiler.attach(self.engine.sync_engine)
+        self.sessions = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        self.healthy = True
+        self.outages = 0
+        self.reads = 0
+        self.last_error: Optional[str] = None
+        
+        @event.listens_for(self.engine.sync_engine, "handle_error")
+        def on_error(context):
+            # Lost or refused connections take the replica out of rotation
+            # at once instead of at the next health check
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(context.original_exception)
+    
+    def mark_down(self, error: BaseException) -> None:
+        if self.healthy:
+            logger.warning("Read replica %s is down: %s", self.name, error)
+            self.outages += 1
+        self.healthy = False
+        self.last_error = f"{type(error).__name__}: {error}"
+    
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "reads": self.reads,
+            "outages": self.outages,
+            "last_error": self.last_error,
+            "pool": self.pool_metrics.stats(self.engine.sync_engine.pool)
+        }
+
+class ReplicaRouter:
+    """
+    Hands read-only routes sessions on read replicas.
+    
+    Replicas take turns among those that passed their last health check
+    (SELECT 1 every health_interval seconds; a lost connection during a
+    request also takes a replica out at once). Reads go to the primary
+    when no replica is healthy, and for sticky_seconds after a client's
+    last write, so it always sees its own changes despite replication lag.
+    """
+    
+    # Users whose sticky windows this process tracks at most
+    MAX_PINNED_SUBJECTS = 100_000
+    
+    def __init__(self, urls: List[str], sticky_seconds: float, health_interval: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.sticky_seconds = sticky_seconds
+        # Token subject -> True, until the end of its sticky window
+        self.pinned_subjects = ExpiringLRU("replica_pinned_subjects", maxsize=self.MAX_PINNED_SUBJECTS)
+        self.health_interval = health_interval
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Metrics
+        self.primary_reads_sticky = 0
+        self.primary_reads_fallback = 0
+    
+    def session(self) -> AsyncSession:
+        """A session for a read-only request."""
+        if self.replicas:
+            if _read_primary.get():
+                self.primary_reads_sticky += 1
+            else:
+                healthy = [replica for replica in self.replicas if replica.healthy]
+                if healthy:
+                    replica = healthy[next(self._turn) % len(healthy)]
+                    replica.reads += 1
+                    return replica.sessions()
+                self.primary_reads_fallback += 1
+        return SessionLocal()
+    
+    async def check(self) -> None:
+        """Health-check every replica."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.health_interval)
+            except Exception as e:
+                replica.mark_down(e)
+                continue
+            if not replica.healthy:
+                logger.info("Read replica %s is back", replica.name)
+                replica.healthy = True
+    
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.health_interval)
+    
+    def start(self) -> None:
+        """Start health-checking replicas on the running event loop."""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop health checks and close replica connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+    
+    def stats(self) -> dict:
+        """Per-replica health and read counts, and reads kept on the primary."""
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "primary_reads_sticky": self.primary_reads_sticky,
+            "primary_reads_fallback": self.primary_reads_fallback,
+            "sticky_seconds": self.sticky_seconds,
+            "health_interval_seconds": self.health_interval
+        }
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware that pins a client's reads to the primary after it writes.
+    
+    A successful POST/PUT/PATCH/DELETE marks the end of the sticky window
+    three ways, and a request matching any of them reads from the primary:
+    
+    - the bearer token's subject, for tokens this process has verified
+      (subject_of maps an Authorization header to it); tracked per
+      worker process.
+    - an X-Read-Primary-Until response header, which API clients can
+      echo back as a request header to hold the window on any worker.
+    - a cookie with the same deadline, which browsers on the API's own
+      site send back on their own.
+    """
+    
+    COOKIE = "db_read_primary_until"
+    HEADER = "X-Read-Primary-Until"
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+    
+    def __init__(self, app, router: ReplicaRouter, subject_of: Callable[[str], Optional[str]] = lambda header: None):
+        self.app = app
+        self.router = router
+        self.subject_of = subject_of
+    
+    @staticmethod
+    def _unexpired(value: str) -> bool:
+        try:
+            return float(value) > time.time()
+        except ValueError:
+            return False
+    
+    def _subject(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                return self.subject_of(value.decode("latin-1"))
+        return None
+    
+    def _pinned(self, scope) -> bool:
+        header = self.HEADER.lower().encode()
+        for name, value in scope["headers"]:
+            if name == header and self._unexpired(value.decode("latin-1")):
+                return True
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(self.COOKIE)
+                if morsel is not None and self._unexpired(morsel.value):
+                    return True
+        subject = self._subject(scope)
+        return subject is not None and self.router.pinned_subjects.get(subject) is not None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        writes = scope["method"] not in self.SAFE_METHODS
+        token = _read_primary.set(self._pinned(scope))
+        
+        async def send_with_pin(message):
+            if writes and message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.router.sticky_seconds
+                # Resolved now: authenticating the write put its token in the cache
+                subject = self._subject(scope)
+                if subject is not None:
+                    self.router.pinned_subjects.set(subject, True, expires_at=until)
+                cookie = (
+                    f"{self.COOKIE}={until:.3f}; Max-Age={int(self.router.sticky_seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                    (self.HEADER.lower().encode(), f"{until:.3f}".encode())
+                ]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _read_primary.reset(token)
+
+# Process-wide router; without DATABASE_REPLICA_URLS every read uses the primary
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    health_interval=settings.REPLICA_HEALTH_INTERVAL
+)
+
+async def get_read_db():
+    """Dependency for read-only routes: a replica session unless the client just wrote."""
+    async with replica_router.session() as db:
+        yield db
@@ -0,0 +1,275 @@
+"""
+Fold the reputation ledger into users' scores, or rebuild scores from it.
+
+    python -m app.db.reputation fold [--batch-size 1000]
+    python -m app.db.reputation recompute [--batch-size 5000]
+    python -m app.db.reputation backfill
+
+Votes and accepted answers append reputation_events rows in their own
+transaction; the ReputationAggregator started by the app lifespan claims
+pending events in batches and adds them to users.reputation_score with one
+batched UPDATE per batch. recompute resets every score to the sum of its
+folded events, one id range per transaction, and is safe to run while the
+aggregator is folding. backfill builds the ledger of a database that
+predates it from the existing votes and accepted answers, then recomputes.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import and_, bindparam, case, func, literal, null, select, true
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.db.database import engine
+from app.models.models import (
+    User, Question, Answer, Reaction, ReactionType, ReputationEvent, ReputationReason, VOTE_TYPES
+)
+from app.repositories.leaderboard import reputation_leaderboard
+from app.repositories.reputation import REPUTATION_POINTS
+
+logger = logging.getLogger(__name__)
+
+events = ReputationEvent.__table__
+users = User.__table__
+
+async def fold_pending(conn: AsyncConnection, batch_size: int) -> Tuple[int, Dict[int, int]]:
+    """
+    Claim up to batch_size of the oldest pending events and add them to users' scores.
+    
+    Claim and score update share the caller's transaction, so a failure
+    leaves the events pending. On Postgres the claim skips events another
+    worker has locked, so concurrent aggregators take disjoint batches.
+    Returns (events folded, {user_id: points added}).
+    """
+    pending = (
+        select(events.c.id)
+        .where(events.c.folded == False)
+        .order_by(events.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = (await conn.execute(
+        events.update()
+        .where(events.c.id.in_(pending), events.c.folded == False)
+        .values(folded=True)
+        .returning(events.c.user_id, events.c.points)
+    )).all()
+    deltas = Counter()
+    for user_id, points in claimed:
+        deltas[user_id] += points
+    # Sorted ids give every worker the same lock order
+    deltas = {user_id: delta for user_id, delta in sorted(deltas.items()) if delta}
+    params = [{"row_id": user_id, "delta": delta} for user_id, delta in deltas.items()]
+    if params:
+        await conn.execute(
+            users.update()
+            .where(users.c.id == bindparam("row_id"))
+            .values(reputation_score=users.c.reputation_score + bindparam("delta")),
+            params
+        )
+    return len(claimed), deltas
+
+async def pending_stats(conn: AsyncConnection) -> dict:
+    """Pending events and the age of the oldest, from the partial pending index."""
+    count, oldest_id = (await conn.execute(
+        select(func.count(), func.min(events.c.id)).where(events.c.folded == False)
+    )).one()
+    age = 0.0
+    if oldest_id is not None:
+        created_at = (await conn.execute(select(events.c.created_at).where(events.c.id == oldest_id))).scalar()
+        if created_at is not None:
+            age = max((datetime.utcnow() - created_at).total_seconds(), 0.0)
+    return {"pending_events": count, "oldest_pending_age_seconds": age}
+
+async def recompute_scores(batch_size: int) -> int:
+    """
+    Reset reputation_score to the sum of each user's folded events; returns rows corrected.
+    
+    Each id range first locks its users, so a fold that has already
+    updated one of them commits before the sums are read, and later folds
+    add their events on top of the recomputed totals.
+    """
+    folded_total = (
+        select(func.coalesce(func.sum(events.c.points), 0))
+        .where(events.c.user_id == users.c.id, events.c.folded == True)
+        .scalar_subquery()
+    )
+    async with engine.connect() as conn:
+        max_id = (await conn.execute(select(func.max(users.c.id)))).scalar() or 0
+    
+    fixed = 0
+    for low in range(1, max_id + 1, batch_size):
+        in_range = and_(users.c.id >= low, users.c.id < low + batch_size)
+        async with engine.begin() as conn:
+            await conn.execute(select(users.c.id).where(in_range).with_for_update())
+            result = await conn.execute(
+                users.update()
+                .where(in_range, users.c.reputation_score != folded_total)
+                .values(reputation_score=folded_total)
+            )
+            fixed += result.rowcount
+    return fixed
+
+def _vote_events(target: str, model, reaction_column, reason: ReputationReason):
+    """INSERT ... SELECT of folded ledger events for every existing vote on target."""
+    points = REPUTATION_POINTS[reason]
+    return events.insert().from_select(
+        ["user_id", "points", "reason", "actor_id", "question_id", "answer_id", "folded", "created_at"],
+        select(
+            model.author_id,
+            case((Reaction.reaction_type == ReactionType.UPVOTE, points), else_=-points),
+            literal(reason, events.c.reason.type),
+            Reaction.user_id,
+            model.id if target == "question" else null(),
+            model.id if target == "answer" else null(),
+            true(),
+            Reaction.created_at,
+        )
+        .select_from(Reaction.__table__.join(model.__table__, reaction_column == model.id))
+        .where(Reaction.reaction_type.in_(VOTE_TYPES))
+        .order_by(Reaction.id)
+    )
+
+async def backfill_ledger() -> int:
+    """Create folded events for existing votes and accepted answers; returns events written."""
+    accepted_points = REPUTATION_POINTS[ReputationReason.ANSWER_ACCEPTED]
+    accepted = events.insert().from_select(
+        ["user_id", "points", "reason", "actor_id", "question_id", "answer_id", "folded", "created_at"],
+        select(
+            Answer.author_id,
+            literal(accepted_points),
+            literal(ReputationReason.ANSWER_ACCEPTED, events.c.reason.type),
+            Question.author_id,
+            Answer.question_id,
+            Answer.id,
+            true(),
+            Answer.updated_at,
+        )
+        .select_from(Answer.__table__.join(Question.__table__, Answer.question_id == Question.id))
+        .where(Answer.is_accepted == True)
+        .order_by(Answer.id)
+    )
+    async with engine.begin() as conn:
+        if (await conn.execute(select(events.c.id).limit(1))).first() is not None:
+            raise ValueError("The reputation ledger is not empty; backfill only builds a new one")
+        await conn.execute(_vote_events("question", Question, Reaction.question_id, ReputationReason.QUESTION_VOTE))
+        await conn.execute(_vote_events("answer", Answer, Reaction.answer_id, ReputationReason.ANSWER_VOTE))
+        await conn.execute(accepted)
+        return (await conn.execute(select(func.count()).select_from(events))).scalar()
+
+class ReputationAggregator:
+    """
+    Background loop folding pending ledger events into reputation scores.
+    
+    Every interval seconds it folds batches of up to batch_size events,
+    each in its own short transaction, until the queue is drained, so a
+    burst of votes costs one UPDATE per affected user per batch instead
+    of one read-modify-write per vote. Scores lag the ledger by at most
+    about one interval. Every worker process can run one; each applies
+    the batches it folds to its own reputation leaderboard.
+    """
+    
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._fold_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Metrics
+        self.batches = 0
+        self.failed_batches = 0
+        self.events_folded = 0
+        self.users_updated = 0
+        self.last_fold_events = 0
+        self.last_fold_seconds = 0.0
+    
+    async def fold(self) -> int:
+        """Fold pending events until fewer than batch_size remain claimable. Returns events folded."""
+        async with self._fold_lock:
+            started = time.perf_counter()
+            total = 0
+            while True:
+                try:
+                    async with engine.begin() as conn:
+                        folded, deltas = await fold_pending(conn, self.batch_size)
+                except Exception:
+                    logger.exception("Folding reputation events failed; they stay pending")
+                    self.failed_batches += 1
+                    break
+                if folded:
+                    reputation_leaderboard.record(deltas)
+                    self.batches += 1
+                    self.events_folded += folded
+                    self.users_updated += len(deltas)
+                    total += folded
+                if folded < self.batch_size:
+                    break
+            if total:
+                self.last_fold_events = total
+                self.last_fold_seconds = time.perf_counter() - started
+            return total
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.fold()
+    
+    def start(self) -> None:
+        """Start the periodic fold loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the fold loop and fold whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.fold()
+    
+    def stats(self) -> dict:
+        """Batch counts and the size and duration of the last fold that found events."""
+        return {
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "events_folded": self.events_folded,
+            "users_updated": self.users_updated,
+            "last_fold_events": self.last_fold_events,
+            "last_fold_seconds": self.last_fold_seconds,
+            "interval_seconds": self.interval,
+            "batch_size": self.batch_size
+        }
+
+# Process-wide aggregator, started by the app lifespan
+reputation_aggregator = ReputationAggregator(
+    interval=settings.REPUTATION_FOLD_INTERVAL,
+    batch_size=settings.REPUTATION_FOLD_BATCH_SIZE
+)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fold or rebuild reputation scores from the ledger.")
+    parser.add_argument("command", choices=["fold", "recompute", "backfill"])
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="events per fold transaction / user ids per recompute transaction")
+    args = parser.parse_args()
+    
+    if args.command == "fold":
+        aggregator = ReputationAggregator(0, args.batch_size or settings.REPUTATION_FOLD_BATCH_SIZE)
+        print(f"{await aggregator.fold()} events folded into {aggregator.users_updated} user scores")
+    else:
+        if args.command == "backfill":
+            try:
+                print(f"{await backfill_ledger()} ledger events written")
+            except ValueError as e:
+                parser.error(str(e))
+        print(f"{await recompute_scores(args.batch_size or 5000)} scores corrected")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,74 +1,126 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
-from app.models.models import User, Question, Answer, Comment, Category, Tag, Event, BlogPost, Reaction
-from app.api import questions, answers, categories, users
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Importing this module is cheap: routers, models and the database engine
+# are imported by create_app(), and nothing touches the database until the
+# lifespan starts. Tables are created by `python -m app.db.init_db`, not on
+# boot.
 
-# Initialize FastAPI app
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    description="A Q&A platform for expats in Korea",
-    version="1.0.0"
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start process-local background state; flush and release it on shutdown."""
+    from app.db.counters import question_views
+    from app.db.database import engine
+    from app.db.jobs import job_queue
+    from app.db.replicas import replica_router
+    from app.db.reputation import reputation_aggregator
+    from app.repositories.leaderboard import reputation_leaderboard
+    from app.repositories.ranking import hot_questions
+    from app.repositories.search import get_search_backend
+    from app.utils.entity_cache import entity_cache
+    from app.utils.metrics import metrics_exporter
+    from app.utils.security import password_hasher
+    
+    await get_search_backend().start(engine)
+    replica_router.start()
+    job_queue.start()
+    question_views.start()
+    hot_questions.start()
+    reputation_leaderboard.start()
+    reputation_aggregator.start()
+    metrics_exporter.start()
+    yield
+    await metrics_exporter.stop()
+    await job_queue.stop()
+    await reputation_aggregator.stop()
+    await reputation_leaderboard.stop()
+    await hot_questions.stop()
+    await question_views.stop()
+    password_hasher.shutdown()
+    await replica_router.stop()
+    await entity_cache.close()
+    await engine.dispose()
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(
-    users.router,
-    prefix=f"{settings.API_V1_STR}/users",
-    tags=["users"]
-)
-
-app.include_router(
-    categories.router,
-    prefix=f"{settings.API_V1_STR}/categories",
-    tags=["categories"]
-)
-
-app.include_router(
-    questions.router,
-    prefix=f"{settings.API_V1_STR}/questions",
-    tags=["questions"]
-)
-
-app.include_router(
-    answers.router,
-    prefix=f"{settings.API_V1_STR}/answers",
-    tags=["answers"]
-)
+def create_app() -> FastAPI:
+    """Build the API application."""
+    from app.api import questions, answers, categories, users, votes, tags, metrics
+    from app.api.deps import verified_subject
+    from app.db.profiling import SQLProfilingMiddleware, sql_profiler
+    from app.db.replicas import ReadYourWritesMiddleware, replica_router
+    from app.utils.metrics import PrometheusMiddleware
+    
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        description="A Q&A platform for expats in Korea",
+        version="1.0.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing", ReadYourWritesMiddleware.HEADER],
+    )
+    app.add_middleware(SQLProfilingMiddleware, profiler=sql_profiler)
+    if replica_router.replicas:
+        app.add_middleware(ReadYourWritesMiddleware, router=replica_router, subject_of=verified_subject)
+    # Outermost, so recorded latency covers every other middleware
+    app.add_middleware(PrometheusMiddleware)
+    
+    # Include routers
+    for router, prefix, tag in (
+        (users.router, f"{settings.API_V1_STR}/users", "users"),
+        (categories.router, f"{settings.API_V1_STR}/categories", "categories"),
+        (tags.router, f"{settings.API_V1_STR}/tags", "tags"),
+        (questions.router, f"{settings.API_V1_STR}/questions", "questions"),
+        (answers.router, f"{settings.API_V1_STR}/answers", "answers"),
+        (votes.router, f"{settings.API_V1_STR}/votes", "votes"),
+        (metrics.router, "/metrics", "metrics"),
+    ):
+        app.include_router(router, prefix=prefix, tags=[tag])
+    
+    # Root endpoint
+    @app.get("/")
+    async def read_root():
+        """Welcome endpoint."""
+        return {
+            "message": "Welcome to AidKo Q&A Platform API",
+            "version": "1.0.0",
+            "docs": "/docs",
+            "api_version": settings.API_V1_STR
+        }
+    
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint."""
+        return {"status": "ok"}
+    
+    return app
 
-# Root endpoint
-@app.get("/")
-def read_root():
-    """Welcome endpoint."""
-    return {
-        "message": "Welcome to AidKo Q&A Platform API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "api_version": settings.API_V1_STR
-    }
+_app = None
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {"status": "ok"}
+def __getattr__(name: str):
+    """Build `app` on first access, so `uvicorn app.main:app` keeps working."""
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host="0.0.0.0",
         port=8000,
         reload=True
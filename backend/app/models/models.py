@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Enum, Table, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import enum
@@ -10,9 +10,30 @@ class UserRole(str, enum.Enum):
     MODERATOR = "moderator"
     ADMIN = "admin"
 
+# Self-referential association table for User.followers / User.following
+followers = Table(
+    "followers",
+    Base.metadata,
+    Column("follower_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("following_id", Integer, ForeignKey("users.id"), primary_key=True),
+)
+
+# Question <-> Tag association; the (tag_id, question_id) index serves tag filters
+question_tags = Table(
+    "question_tags",
+    Base.metadata,
+    Column("question_id", Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_question_tags_tag_id_question_id", "tag_id", "question_id"),
+)
+
 class User(Base):
     """User model - represents platform users."""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination on (joined_date, id)
+        Index("ix_users_joined_date_id", "joined_date", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -25,6 +46,8 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
     reputation_score = Column(Integer, default=0, nullable=False)
+    question_count = Column(Integer, default=0, nullable=False)
+    answer_count = Column(Integer, default=0, nullable=False)
     location = Column(String(255), nullable=True)
     country = Column(String(100), nullable=True)  # e.g., "South Korea"
     joined_date = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -62,6 +85,10 @@ class Category(Base):
 class Tag(Base):
     """Tag model - question tags for better categorization."""
     __tablename__ = "tags"
+    __table_args__ = (
+        # Tag listing, most used first
+        Index("ix_tags_usage_count_name", "usage_count", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
@@ -72,15 +99,21 @@ class Tag(Base):
 class Question(Base):
     """Question model - main content."""
     __tablename__ = "questions"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), globally and per filter
+        Index("ix_questions_created_at_id", "created_at", "id"),
+        Index("ix_questions_category_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_questions_author_created_at_id", "author_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(300), nullable=False, index=True)
     description = Column(Text, nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
-    tags = Column(String(500), nullable=True)  # Comma-separated tag names
     view_count = Column(Integer, default=0, nullable=False)
     vote_count = Column(Integer, default=0, nullable=False)
+    answer_count = Column(Integer, default=0, nullable=False)
     is_resolved = Column(Boolean, default=False, nullable=False)
     is_featured = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -89,6 +122,7 @@ class Question(Base):
     # Relationships
     author = relationship("User", back_populates="questions", foreign_keys=[author_id])
     category = relationship("Category", back_populates="questions")
+    tags = relationship("Tag", secondary="question_tags", order_by="Tag.name")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="question", cascade="all, delete-orphan")
     reactions = relationship("Reaction", back_populates="question", cascade="all, delete-orphan")
@@ -96,6 +130,10 @@ class Question(Base):
 class Answer(Base):
     """Answer model - responses to questions."""
     __tablename__ = "answers"
+    __table_args__ = (
+        # Keyset pagination of a question's answers on (created_at, id)
+        Index("ix_answers_question_created_at_id", "question_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
@@ -137,6 +175,8 @@ class ReactionType(str, enum.Enum):
     USEFUL = "useful"
     BOOKMARK = "bookmark"
 
+VOTE_TYPES = (ReactionType.UPVOTE, ReactionType.DOWNVOTE)
+
 class Reaction(Base):
     """Reaction model - votes and reactions on content."""
     __tablename__ = "reactions"
@@ -149,12 +189,79 @@ class Reaction(Base):
     reaction_type = Column(Enum(ReactionType), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
+    # One vote (up or down) per user per question / answer; other reaction types are unrestricted
+    __table_args__ = (
+        Index(
+            "uq_reactions_question_vote", "user_id", "question_id", unique=True,
+            postgresql_where=reaction_type.in_(VOTE_TYPES) & question_id.isnot(None),
+            sqlite_where=reaction_type.in_(VOTE_TYPES) & question_id.isnot(None)
+        ),
+        Index(
+            "uq_reactions_answer_vote", "user_id", "answer_id", unique=True,
+            postgresql_where=reaction_type.in_(VOTE_TYPES) & answer_id.isnot(None),
+            sqlite_where=reaction_type.in_(VOTE_TYPES) & answer_id.isnot(None)
+        ),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="reactions")
     question = relationship("Question", back_populates="reactions")
     answer = relationship("Answer", back_populates="reactions")
     comment = relationship("Comment")
 
+class ReputationReason(str, enum.Enum):
+    """Why a reputation event was recorded."""
+    QUESTION_VOTE = "question_vote"
+    ANSWER_VOTE = "answer_vote"
+    ANSWER_ACCEPTED = "answer_accepted"
+
+class ReputationEvent(Base):
+    """
+    ReputationEvent model - append-only reputation ledger.
+    
+    Written in the same transaction as the vote or acceptance that caused
+    it; the aggregator folds pending events into User.reputation_score in
+    batches and flips folded, which is the only column ever updated.
+    Question and answer ids are kept without foreign keys so the history
+    outlives deleted content.
+    """
+    __tablename__ = "reputation_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    points = Column(Integer, nullable=False)
+    reason = Column(Enum(ReputationReason), nullable=False)
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    question_id = Column(Integer, nullable=True)
+    answer_id = Column(Integer, nullable=True)
+    folded = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # A user's history, newest first, and per-user sums for recomputes
+        Index("ix_reputation_events_user_created_at_id", "user_id", "created_at", "id"),
+        # The aggregator's queue: only pending events are indexed
+        Index(
+            "ix_reputation_events_pending", "id",
+            postgresql_where=folded == False,
+            sqlite_where=folded == False
+        ),
+    )
+
+class CompletedJob(Base):
+    """
+    CompletedJob model - idempotency keys of finished background jobs.
+    
+    A job inserts its key in the same transaction as its effects, so a
+    retried or duplicated delivery finds the key and does nothing. Keys
+    older than JOB_KEY_RETENTION_HOURS are pruned.
+    """
+    __tablename__ = "completed_jobs"
+    
+    key = Column(String(200), primary_key=True)
+    name = Column(String(100), nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
 class Event(Base):
     """Event model - community events."""
     __tablename__ = "events"
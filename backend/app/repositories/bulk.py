@@ -0,0 +1,286 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterable, List
+from sqlalchemy import select, func, text
+from app.core.config import settings
+from app.models.models import User, Category, Question, Answer, Comment, Tag, question_tags
+from app.repositories.repositories import BaseRepository, TagRepository, parse_tags
+from app.repositories.search import get_search_backend
+
+QUESTION_FIELDS = ("title", "description", "view_count", "vote_count", "is_resolved", "is_featured")
+ANSWER_FIELDS = ("content", "vote_count", "is_accepted")
+COMMENT_FIELDS = ("content", "vote_count")
+
+def _authored(records: List[dict]) -> Iterable[dict]:
+    """Every question, answer and comment in a batch of records."""
+    for record in records:
+        yield record
+        yield from record.get("comments") or []
+        for answer in record.get("answers") or []:
+            yield answer
+            yield from answer.get("comments") or []
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value) if value else datetime.utcnow()
+
+class BulkRepository(BaseRepository):
+    """
+    Bulk export and import of questions with their answers and comments.
+    
+    A record is one question as a dict, with its answers and comments
+    nested; authors and categories are carried both by id and by
+    username/name so records can be loaded into a different database.
+    """
+    
+    async def export_questions(self, batch_size: int = settings.BULK_BATCH_SIZE) -> AsyncIterator[dict]:
+        """
+        Yield every question as an export record, oldest first.
+        
+        Questions come from a server-side cursor (yield_per), and the
+        tags, answers and comments of each partition are loaded with three
+        IN queries, so memory stays bounded by batch_size however large
+        the table is.
+        """
+        query = (
+            select(Question.__table__, User.username, Category.name)
+            .join(User, User.id == Question.author_id)
+            .join(Category, Category.id == Question.category_id)
+            .order_by(Question.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(query)
+        async for rows in result.partitions():
+            question_ids = [row.id for row in rows]
+            tags = await self._tags_by_question(question_ids)
+            answers = await self._answers_by_question(question_ids)
+            comments = await self._comments_by_parent(
+                question_ids, [answer["id"] for group in answers.values() for answer in group]
+            )
+            for row in rows:
+                record = {field: getattr(row, field) for field in ("id",) + QUESTION_FIELDS}
+                record.update(
+                    author_id=row.author_id,
+                    author=row.username,
+                    category_id=row.category_id,
+                    category=row.name,
+                    tags=tags.get(row.id, []),
+                    created_at=row.created_at,
+                    updated_at=row.updated_at,
+                    answers=answers.get(row.id, []),
+                    comments=comments.get(("question", row.id), [])
+                )
+                for answer in record["answers"]:
+                    answer["comments"] = comments.get(("answer", answer["id"]), [])
+                yield record
+    
+    async def _tags_by_question(self, question_ids: List[int]) -> Dict[int, List[str]]:
+        rows = await self.db.execute(
+            select(question_tags.c.question_id, Tag.name)
+            .join(Tag, Tag.id == question_tags.c.tag_id)
+            .where(question_tags.c.question_id.in_(question_ids))
+            .order_by(question_tags.c.question_id, Tag.name)
+        )
+        tags = defaultdict(list)
+        for question_id, name in rows:
+            tags[question_id].append(name)
+        return tags
+    
+    async def _answers_by_question(self, question_ids: List[int]) -> Dict[int, List[dict]]:
+        rows = await self.db.execute(
+            select(Answer.__table__, User.username)
+            .join(User, User.id == Answer.author_id)
+            .where(Answer.question_id.in_(question_ids))
+            .order_by(Answer.id)
+        )
+        answers = defaultdict(list)
+        for row in rows:
+            answer = {field: getattr(row, field) for field in ("id",) + ANSWER_FIELDS}
+            answer.update(author_id=row.author_id, author=row.username,
+                          created_at=row.created_at, updated_at=row.updated_at)
+            answers[row.question_id].append(answer)
+        return answers
+    
+    async def _comments_by_parent(self, question_ids: List[int], answer_ids: List[int]) -> Dict[tuple, List[dict]]:
+        on_question = Comment.question_id.in_(question_ids)
+        query = (
+            select(Comment.__table__, User.username)
+            .join(User, User.id == Comment.author_id)
+            .where(on_question | Comment.answer_id.in_(answer_ids) if answer_ids else on_question)
+            .order_by(Comment.id)
+        )
+        comments = defaultdict(list)
+        for row in await self.db.execute(query):
+            comment = {field: getattr(row, field) for field in ("id",) + COMMENT_FIELDS}
+            comment.update(author_id=row.author_id, author=row.username,
+                           created_at=row.created_at, updated_at=row.updated_at)
+            parent = ("answer", row.answer_id) if row.answer_id else ("question", row.question_id)
+            comments[parent].append(comment)
+        return comments
+    
+    async def import_questions(self, records: Iterable[dict],
+                               batch_size: int = settings.BULK_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Insert export records as new rows, committing once per batch.
+        
+        Rows get fresh ids; original ids are ignored. Authors and
+        categories are matched by username/name when given, else by id,
+        and records whose author or category does not exist are skipped.
+        """
+        counts = Counter()
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                counts.update(await self._import_batch(batch))
+                batch = []
+        if batch:
+            counts.update(await self._import_batch(batch))
+        return dict(counts)
+    
+    async def _lookup(self, column, values: set) -> dict:
+        """Map values of a unique column to row ids."""
+        values.discard(None)
+        if not values:
+            return {}
+        rows = await self.db.execute(select(column, column.class_.id).where(column.in_(values)))
+        return dict(rows.all())
+    
+    async def _begin_batch(self) -> None:
+        """
+        Open a batch's transaction, holding SQLite's write lock from the start.
+        
+        SQLite has no sequence to reserve ids from, so _reserve_ids reads
+        max(id); BEGIN IMMEDIATE keeps other writers, such as a running
+        API, from inserting rows between that read and the batch's insert.
+        They wait on their busy timeout until the batch commits.
+        """
+        connection = await self.db.connection()
+        if connection.dialect.name == "sqlite":
+            await self.db.execute(text("BEGIN IMMEDIATE"))
+    
+    async def _reserve_ids(self, model, count: int) -> List[int]:
+        """Allocate ids for rows inserted with explicit primary keys; see _begin_batch for SQLite."""
+        if not count:
+            return []
+        connection = await self.db.connection()
+        if connection.dialect.name == "postgresql":
+            rows = await self.db.execute(text(
+                f"SELECT nextval(pg_get_serial_sequence('{model.__tablename__}', 'id')) "
+                f"FROM generate_series(1, :count)"
+            ), {"count": count})
+            return [row[0] for row in rows]
+        first = ((await self.db.execute(select(func.max(model.id)))).scalar() or 0) + 1
+        return list(range(first, first + count))
+    
+    async def _insert(self, table, rows: List[dict]) -> None:
+        """COPY rows into a table on asyncpg, one executemany INSERT elsewhere."""
+        if not rows:
+            return
+        connection = await self.db.connection()
+        if connection.dialect.driver == "asyncpg":
+            raw = await connection.get_raw_connection()
+            columns = list(rows[0])
+            await raw.driver_connection.copy_records_to_table(
+                table.name, columns=columns, records=[tuple(row[column] for column in columns) for row in rows]
+            )
+        else:
+            await self.db.execute(table.insert(), rows)
+    
+    async def _import_batch(self, records: List[dict]) -> Counter:
+        counts = Counter()
+        await self._begin_batch()
+        users_by_name = await self._lookup(User.username, {item.get("author") for item in _authored(records)})
+        users_by_id = await self._lookup(User.id, {item.get("author_id") for item in _authored(records)})
+        categories_by_name = await self._lookup(Category.name, {record.get("category") for record in records})
+        categories_by_id = await self._lookup(Category.id, {record.get("category_id") for record in records})
+        
+        def author(item: dict):
+            if item.get("author"):
+                return users_by_name.get(item["author"])
+            return users_by_id.get(item.get("author_id"))
+        
+        accepted = []
+        for record in records:
+            category_id = (categories_by_name.get(record["category"]) if record.get("category")
+                           else categories_by_id.get(record.get("category_id")))
+            if author(record) is None or category_id is None:
+                counts["skipped"] += 1
+                continue
+            accepted.append((record, category_id))
+        
+        question_ids = await self._reserve_ids(Question, len(accepted))
+        question_rows, answer_rows, comment_rows, tag_rows = [], [], [], []
+        answer_parents = []
+        for question_id, (record, category_id) in zip(question_ids, accepted):
+            answers = [answer for answer in record.get("answers") or [] if author(answer) is not None]
+            question_rows.append(dict(
+                {field: record.get(field, 0 if field.endswith("_count") else False) for field in QUESTION_FIELDS},
+                id=question_id,
+                author_id=author(record),
+                category_id=category_id,
+                answer_count=len(answers),
+                created_at=_timestamp(record.get("created_at")),
+                updated_at=_timestamp(record.get("updated_at"))
+            ))
+            tags = record.get("tags") or []
+            tag_rows.append((question_id, parse_tags(",".join(tags) if isinstance(tags, list) else tags)))
+            answer_parents.extend((question_id, answer) for answer in answers)
+            for comment in record.get("comments") or []:
+                comment_rows.append((question_id, None, comment))
+        
+        answer_ids = await self._reserve_ids(Answer, len(answer_parents))
+        for answer_id, (question_id, answer) in zip(answer_ids, answer_parents):
+            answer_rows.append(dict(
+                {field: answer.get(field, 0 if field.endswith("_count") else False) for field in ANSWER_FIELDS},
+                id=answer_id,
+                author_id=author(answer),
+                question_id=question_id,
+                created_at=_timestamp(answer.get("created_at")),
+                updated_at=_timestamp(answer.get("updated_at"))
+            ))
+            for comment in answer.get("comments") or []:
+                comment_rows.append((None, answer_id, comment))
+        
+        comment_rows = [parent for parent in comment_rows if author(parent[2]) is not None]
+        comment_ids = await self._reserve_ids(Comment, len(comment_rows))
+        comment_rows = [
+            dict(
+                {field: comment.get(field, 0) for field in COMMENT_FIELDS},
+                id=comment_id,
+                author_id=author(comment),
+                question_id=question_id,
+                answer_id=answer_id,
+                created_at=_timestamp(comment.get("created_at")),
+                updated_at=_timestamp(comment.get("updated_at"))
+            )
+            for comment_id, (question_id, answer_id, comment) in zip(comment_ids, comment_rows)
+        ]
+        
+        tag_repo = TagRepository(self.db)
+        names = sorted({name for _, question_names in tag_rows for name in question_names})
+        tag_ids = {tag.name: tag.id for tag in await tag_repo.get_or_create_tags(names)}
+        association_rows = [
+            {"question_id": question_id, "tag_id": tag_ids[name]}
+            for question_id, question_names in tag_rows
+            for name in question_names
+        ]
+        
+        await self._insert(Question.__table__, question_rows)
+        await self._insert(question_tags, association_rows)
+        await self._insert(Answer.__table__, answer_rows)
+        await self._insert(Comment.__table__, comment_rows)
+        
+        await self._increment_many(Tag, "usage_count", Counter(row["tag_id"] for row in association_rows))
+        await self._increment_many(Category, "question_count", Counter(row["category_id"] for row in question_rows))
+        await self._increment_many(User, "question_count", Counter(row["author_id"] for row in question_rows))
+        await self._increment_many(User, "answer_count", Counter(row["author_id"] for row in answer_rows))
+        search = get_search_backend()
+        for row in question_rows:
+            await search.index_question(self.db, SimpleNamespace(**row))
+        await self.db.commit()
+        
+        counts.update(questions=len(question_rows), answers=len(answer_rows), comments=len(comment_rows))
+        return counts
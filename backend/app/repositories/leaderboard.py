@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from sortedcontainers import SortedList
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.database import engine
+from app.models.models import User
+
+logger = logging.getLogger(__name__)
+
+class ReputationLeaderboard:
+    """
+    In-memory reputation ranking of active users, overall and per country.
+    
+    Users are kept in SortedLists of (-score, user_id), one for everyone
+    and one per User.country, so a page is a slice, a user's rank is one
+    bisect instead of counting higher-scored rows in SQL, and a score
+    change is a logarithmic remove and add rather than a list shift.
+    Ranks are competition ranks: users with equal scores share one.
+    
+    Each worker process keeps its own index. The reputation aggregator
+    applies every batch it folds; a periodic rebuild from the database
+    (every refresh_interval seconds) picks up batches folded by other
+    processes, new users and deactivations. Changes made while a rebuild
+    is reading are logged and replayed onto the new ranking before it
+    replaces the old one.
+    """
+    
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        # user_id -> (score, country)
+        self._entries: Dict[int, tuple] = {}
+        # (-score, user_id), ascending = highest score first
+        self._ranked = SortedList()
+        self._by_country: Dict[str, SortedList] = {}
+        # (operation, user_id, args) applied while a rebuild is reading, else None
+        self._rebuild_log: Optional[List[tuple]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+        self.last_rebuild_seconds = 0.0
+    
+    def _lists(self, country: Optional[str]) -> List[SortedList]:
+        if country is None:
+            return [self._ranked]
+        return [self._ranked, self._by_country.setdefault(country, SortedList())]
+    
+    def _put(self, user_id: int, score: int, country: Optional[str]) -> None:
+        old = self._entries.get(user_id)
+        if old is not None:
+            for ranked in self._lists(old[1]):
+                ranked.remove((-old[0], user_id))
+        self._entries[user_id] = (score, country)
+        for ranked in self._lists(country):
+            ranked.add((-score, user_id))
+    
+    def add(self, user_id: int, score: int, country: Optional[str] = None) -> None:
+        """Insert or replace a user."""
+        with self._lock:
+            self._put(user_id, score, country)
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("add", user_id, (score, country)))
+    
+    def record(self, deltas: Dict[int, int]) -> None:
+        """Apply per-user score deltas; users not in the index are ignored."""
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.extend(("record", user_id, delta) for user_id, delta in deltas.items() if delta)
+            for user_id, delta in deltas.items():
+                entry = self._entries.get(user_id)
+                if entry is not None and delta:
+                    self._put(user_id, entry[0] + delta, entry[1])
+    
+    def page(self, skip: int = 0, limit: int = 20, country: Optional[str] = None) -> List[tuple]:
+        """(user_id, score, rank) for one page of the leaderboard, highest score first."""
+        with self._lock:
+            ranked = self._ranked if country is None else self._by_country.get(country, SortedList())
+            rows = []
+            rank = 0
+            previous = None
+            for position, (negative_score, user_id) in enumerate(ranked.islice(skip, skip + limit), start=skip + 1):
+                if negative_score != previous:
+                    # A page can start inside a run of tied scores
+                    rank = position if previous is not None else ranked.bisect_left((negative_score,)) + 1
+                    previous = negative_score
+                rows.append((user_id, -negative_score, rank))
+            return rows
+    
+    def rank(self, user_id: int) -> Optional[dict]:
+        """A user's score and rank overall and in their country; None if not ranked."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            score, country = entry
+            position = {
+                "user_id": user_id,
+                "reputation_score": score,
+                "rank": self._ranked.bisect_left((-score,)) + 1,
+                "total": len(self._ranked),
+                "country": country,
+                "country_rank": None,
+                "country_total": None
+            }
+            if country is not None:
+                ranked = self._by_country[country]
+                position["country_rank"] = ranked.bisect_left((-score,)) + 1
+                position["country_total"] = len(ranked)
+            return position
+    
+    async def rebuild(self) -> int:
+        """Reload the ranking from the database. Returns the number of users ranked."""
+        started = time.monotonic()
+        query = select(User.id, User.reputation_score, User.country).where(User.is_active == True)
+        with self._lock:
+            self._rebuild_log = []
+        try:
+            async with engine.connect() as conn:
+                rows = (await conn.execute(query)).all()
+        except BaseException:
+            with self._lock:
+                self._rebuild_log = None
+            raise
+        
+        entries = {user_id: (score, country) for user_id, score, country in rows}
+        with self._lock:
+            # A fold committed just before the query started can be both
+            # read and replayed, counting twice until the next rebuild;
+            # without the log every change made during the query is lost
+            # until then
+            log, self._rebuild_log = self._rebuild_log, None
+            for operation, user_id, args in log:
+                if operation == "add":
+                    entries.setdefault(user_id, args)
+                elif user_id in entries:
+                    score, country = entries[user_id]
+                    entries[user_id] = (score + args, country)
+            country_rows: Dict[str, List[tuple]] = {}
+            for user_id, (score, country) in entries.items():
+                if country is not None:
+                    country_rows.setdefault(country, []).append((-score, user_id))
+            ranked = SortedList((-score, user_id) for user_id, (score, _) in entries.items())
+            by_country = {country: SortedList(members) for country, members in country_rows.items()}
+            self._entries, self._ranked, self._by_country = entries, ranked, by_country
+        self.rebuilds += 1
+        self.last_rebuild_seconds = time.monotonic() - started
+        return len(ranked)
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Rebuilding the reputation leaderboard failed")
+            await asyncio.sleep(self.refresh_interval)
+    
+    def start(self) -> None:
+        """Build the index and keep rebuilding it on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the rebuild loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def stats(self) -> dict:
+        """Index size and rebuild timing."""
+        return {
+            "users": len(self._ranked),
+            "countries": len(self._by_country),
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+            "refresh_interval_seconds": self.refresh_interval
+        }
+
+# Process-wide leaderboard
+reputation_leaderboard = ReputationLeaderboard(refresh_interval=settings.LEADERBOARD_REFRESH_INTERVAL)
@@ -0,0 +1,32 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+class BatchLoader:
+    """
+    Per-request, DataLoader-style batching of lookups by key.
+    
+    Callers gather every key they will need and ask for them at once;
+    keys already seen are served from the loader's memo and the rest are
+    fetched with a single call to fetch (one IN query), in chunks of at
+    most max_batch keys. Create one loader per request so the memo never
+    outlives the session it was filled from.
+    """
+    
+    def __init__(self, fetch: Callable[[List[Hashable]], Awaitable[Iterable[Any]]],
+                 key: Callable[[Any], Hashable] = lambda row: row.id, max_batch: int = 500):
+        self.fetch = fetch
+        self.key = key
+        self.max_batch = max_batch
+        self._memo: Dict[Hashable, Any] = {}
+    
+    def prime(self, row: Any) -> None:
+        """Remember a row that was loaded some other way."""
+        self._memo[self.key(row)] = row
+    
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Rows for keys, by key; keys with no row are left out."""
+        wanted = list(dict.fromkeys(keys))
+        missing = [key for key in wanted if key not in self._memo]
+        for start in range(0, len(missing), self.max_batch):
+            for row in await self.fetch(missing[start:start + self.max_batch]):
+                self.prime(row)
+        return {key: self._memo[key] for key in wanted if key in self._memo}
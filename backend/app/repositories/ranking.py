@@ -0,0 +1,189 @@
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.counters import question_views
+from app.db.database import engine
+from app.models.models import Question
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+class HotQuestionIndex:
+    """
+    In-memory "hot" ranking of recent questions.
+    
+    score = log10(engagement) + created_at / decay, where engagement
+    weighs votes, answers and views. Age enters as a constant offset per
+    question, so scores never need recomputing as time passes: a question
+    has to gather 10x the engagement of one posted decay_hours later to
+    rank level with it. Votes, views and answers move a single entry in a
+    sorted list, and pages are list slices.
+    
+    Each worker process keeps its own index; a periodic rebuild from the
+    database (every refresh_interval seconds) folds in writes made by
+    other processes and drops questions older than window_days. Changes
+    made while a rebuild is reading are logged and replayed onto the new
+    ranking before it replaces the old one.
+    """
+    
+    VOTE_WEIGHT = 1.0
+    ANSWER_WEIGHT = 2.0
+    VIEW_WEIGHT = 0.05
+    
+    def __init__(self, decay_hours: float, window_days: float, refresh_interval: float):
+        self.decay_seconds = decay_hours * 3600
+        self.window_days = window_days
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        # question_id -> [created_ts, votes, answers, views, score]
+        self._entries: Dict[int, list] = {}
+        # (-score, -question_id), ascending = hottest first
+        self._ranked: List[tuple] = []
+        # (operation, question_id, args) applied while a rebuild is reading, else None
+        self._rebuild_log: Optional[List[tuple]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+        self.last_rebuild_seconds = 0.0
+    
+    def _score(self, created_ts: float, votes: int, answers: int, views: int) -> float:
+        engagement = votes * self.VOTE_WEIGHT + answers * self.ANSWER_WEIGHT + views * self.VIEW_WEIGHT
+        order = math.log10(max(abs(engagement), 1.0))
+        sign = 1 if engagement > 0 else -1 if engagement < 0 else 0
+        return sign * order + created_ts / self.decay_seconds
+    
+    def _put(self, question_id: int, entry: list) -> None:
+        old = self._entries.get(question_id)
+        if old is not None:
+            index = bisect.bisect_left(self._ranked, (-old[4], -question_id))
+            del self._ranked[index]
+        entry[4] = self._score(*entry[:4])
+        self._entries[question_id] = entry
+        bisect.insort(self._ranked, (-entry[4], -question_id))
+    
+    def add(self, question_id: int, created_at: datetime, votes: int = 0, answers: int = 0, views: int = 0) -> None:
+        """Insert or replace a question."""
+        created_ts = (created_at - EPOCH).total_seconds()
+        with self._lock:
+            self._put(question_id, [created_ts, votes, answers, views, 0.0])
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("add", question_id, [created_ts, votes, answers, views, 0.0]))
+    
+    def record(self, question_id: int, votes: int = 0, answers: int = 0, views: int = 0) -> None:
+        """Apply engagement deltas to a question; ignored if it is not in the index."""
+        with self._lock:
+            # Views are not logged: the rebuild reads them from question_views.pending()
+            if self._rebuild_log is not None and (votes or answers):
+                self._rebuild_log.append(("record", question_id, (votes, answers)))
+            entry = self._entries.get(question_id)
+            if entry is None:
+                return
+            self._put(question_id, [entry[0], entry[1] + votes, entry[2] + answers, entry[3] + views, 0.0])
+    
+    def remove(self, question_id: int) -> None:
+        """Drop a question from the ranking."""
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("remove", question_id, None))
+            entry = self._entries.pop(question_id, None)
+            if entry is not None:
+                index = bisect.bisect_left(self._ranked, (-entry[4], -question_id))
+                del self._ranked[index]
+    
+    def page(self, skip: int = 0, limit: int = 20) -> List[int]:
+        """Question ids for one page of the feed, hottest first."""
+        with self._lock:
+            return [-negative_id for _, negative_id in self._ranked[skip:skip + limit]]
+    
+    async def rebuild(self) -> int:
+        """Reload the ranking from the database. Returns the number of questions ranked."""
+        started = time.monotonic()
+        since = datetime.utcnow() - timedelta(days=self.window_days)
+        query = select(
+            Question.id, Question.created_at, Question.vote_count, Question.view_count, Question.answer_count
+        ).where(Question.created_at >= since)
+        with self._lock:
+            self._rebuild_log = []
+        try:
+            async with engine.connect() as conn:
+                rows = (await conn.execute(query)).all()
+        except BaseException:
+            with self._lock:
+                self._rebuild_log = None
+            raise
+        
+        entries = {}
+        for question_id, created_at, votes, views, answers in rows:
+            views += question_views.pending(question_id)
+            created_ts = (created_at - EPOCH).total_seconds()
+            entries[question_id] = [created_ts, votes, answers, views, 0.0]
+        with self._lock:
+            # A change committed just before the query started can be both
+            # read and replayed, counting twice until the next rebuild;
+            # without the log every change made during the query is lost
+            # until then
+            log, self._rebuild_log = self._rebuild_log, None
+            for operation, question_id, args in log:
+                if operation == "add":
+                    entries.setdefault(question_id, args)
+                elif operation == "remove":
+                    entries.pop(question_id, None)
+                elif question_id in entries:
+                    entry = entries[question_id]
+                    entry[1] += args[0]
+                    entry[2] += args[1]
+            for entry in entries.values():
+                entry[4] = self._score(*entry[:4])
+            ranked = sorted((-entry[4], -question_id) for question_id, entry in entries.items())
+            self._entries, self._ranked = entries, ranked
+        self.rebuilds += 1
+        self.last_rebuild_seconds = time.monotonic() - started
+        return len(ranked)
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Rebuilding the hot questions index failed")
+            await asyncio.sleep(self.refresh_interval)
+    
+    def start(self) -> None:
+        """Build the index and keep rebuilding it on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the rebuild loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def stats(self) -> dict:
+        """Index size and rebuild timing."""
+        return {
+            "questions": len(self._ranked),
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+            "decay_hours": self.decay_seconds / 3600,
+            "window_days": self.window_days,
+            "refresh_interval_seconds": self.refresh_interval
+        }
+
+# Process-wide hot feed
+hot_questions = HotQuestionIndex(
+    decay_hours=settings.HOT_DECAY_HOURS,
+    window_days=settings.HOT_WINDOW_DAYS,
+    refresh_interval=settings.HOT_REFRESH_INTERVAL
+)
@@ -1,31 +1,84 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import select, func
-from app.models.models import User, Question, Answer, Comment, Category, Tag, Event, BlogPost, Reaction
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select, select, func, update, tuple_, bindparam
+from app.models.models import (
+    User, Question, Answer, Comment, Category, Tag, Event, BlogPost, Reaction, VOTE_TYPES, question_tags
+)
 from app.schemas.schemas import UserCreate, QuestionCreate, AnswerCreate, CommentCreate
+from app.utils.pagination import Cursor, apply_keyset
+from app.repositories.search import get_search_backend
+from app.db.jobs import job_queue
 from typing import Optional, List
 
+def is_unique_violation(error: IntegrityError) -> bool:
+    """Whether error broke a unique constraint, as opposed to a foreign key or NOT NULL."""
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    if code is not None:
+        return code == "23505"
+    return "UNIQUE constraint failed" in str(error.orig)
+
 class BaseRepository:
     """Base repository class with common CRUD operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
+    
+    async def _first(self, query: Select):
+        """Execute a select and return the first entity or None."""
+        result = await self.db.execute(query)
+        return result.scalars().first()
+    
+    async def _all(self, query: Select) -> list:
+        """Execute a select and return all entities."""
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def _increment(self, model, row_id: int, column: str, delta: int) -> None:
+        """Atomically add delta to a counter column of one row, in the current transaction."""
+        if delta:
+            await self.db.execute(
+                update(model)
+                .where(model.id == row_id)
+                .values({column: getattr(model, column) + delta})
+            )
+    
+    async def _increment_many(self, model, column: str, deltas: dict) -> None:
+        """Apply per-row counter deltas as one batched UPDATE, in id order."""
+        table = model.__table__
+        params = [
+            {"row_id": row_id, "delta": delta}
+            for row_id, delta in sorted(deltas.items())
+            if delta
+        ]
+        if params:
+            await self.db.execute(
+                table.update()
+                .where(table.c.id == bindparam("row_id"))
+                .values({column: table.c[column] + bindparam("delta")}),
+                params
+            )
 
 class UserRepository(BaseRepository):
     """User data access layer."""
     
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        return await self._first(select(User).filter(User.id == user_id))
+    
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Get the users with the given IDs, in no particular order."""
+        return await self._all(select(User).filter(User.id.in_(user_ids)))
     
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first()
+        return await self._first(select(User).filter(User.email == email))
     
-    def get_user_by_username(self, username: str) -> Optional[User]:
+    async def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return self.db.query(User).filter(User.username == username).first()
+        return await self._first(select(User).filter(User.username == username))
     
-    def create_user(self, user: UserCreate, hashed_password: str) -> User:
+    async def create_user(self, user: UserCreate, hashed_password: str) -> User:
         """Create new user."""
         db_user = User(
             email=user.email,
@@ -37,34 +90,35 @@ class UserRepository(BaseRepository):
             country=user.country
         )
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         return db_user
     
-    def get_all_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        """Get all users with pagination."""
-        return self.db.query(User).offset(skip).limit(limit).all()
+    async def get_all_users(self, skip: int = 0, limit: int = 100,
+                            cursor: Optional[Cursor] = None) -> List[User]:
+        """Get all users, newest first, by offset or by keyset cursor."""
+        query = apply_keyset(select(User), User.joined_date, User.id, cursor)
+        return await self._all(query.offset(skip).limit(limit))
+    
+    async def update_password_hash(self, user: User, hashed_password: str) -> None:
+        """Replace a user's password hash."""
+        user.hashed_password = hashed_password
+        await self.db.commit()
     
-    def update_reputation(self, user_id: int, points: int) -> None:
-        """Update user reputation score."""
-        user = self.get_user_by_id(user_id)
-        if user:
-            user.reputation_score += points
-            self.db.commit()
 
 class CategoryRepository(BaseRepository):
     """Category data access layer."""
     
-    def get_category_by_id(self, category_id: int) -> Optional[Category]:
+    async def get_category_by_id(self, category_id: int) -> Optional[Category]:
         """Get category by ID."""
-        return self.db.query(Category).filter(Category.id == category_id).first()
+        return await self._first(select(Category).filter(Category.id == category_id))
     
-    def get_all_categories(self) -> List[Category]:
+    async def get_all_categories(self) -> List[Category]:
         """Get all categories."""
-        return self.db.query(Category).order_by(Category.question_count.desc()).all()
+        return await self._all(select(Category).order_by(Category.question_count.desc()))
     
-    def create_category(self, name: str, description: Optional[str] = None, 
-                       icon_url: Optional[str] = None, color_hex: Optional[str] = None) -> Category:
+    async def create_category(self, name: str, description: Optional[str] = None,
+                              icon_url: Optional[str] = None, color_hex: Optional[str] = None) -> Category:
         """Create new category."""
         category = Category(
             name=name,
@@ -73,81 +127,218 @@ class CategoryRepository(BaseRepository):
             color_hex=color_hex
         )
         self.db.add(category)
-        self.db.commit()
-        self.db.refresh(category)
+        await self.db.commit()
+        await self.db.refresh(category)
         return category
 
+TAG_NAME_MAX_LENGTH = 50
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Split a comma-separated tag string into unique, lowercase tag names."""
+    names = []
+    for raw in (value or "").split(","):
+        name = raw.strip().lower()[:TAG_NAME_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+class TagRepository(BaseRepository):
+    """Tag data access layer."""
+    
+    async def get_tags(self, skip: int = 0, limit: int = 50, prefix: Optional[str] = None) -> List[Tag]:
+        """Get tags, most used first, optionally by name prefix."""
+        query = select(Tag)
+        if prefix:
+            query = query.filter(Tag.name.startswith(prefix.lower(), autoescape=True))
+        return await self._all(
+            query.order_by(Tag.usage_count.desc(), Tag.name).offset(skip).limit(limit)
+        )
+    
+    async def get_or_create_tags(self, names: List[str]) -> List[Tag]:
+        """Return Tag rows for names, creating the missing ones, in the order given."""
+        if not names:
+            return []
+        tags = {tag.name: tag for tag in await self._all(select(Tag).filter(Tag.name.in_(names)))}
+        missing = [name for name in names if name not in tags]
+        if missing:
+            try:
+                async with self.db.begin_nested():
+                    created = [Tag(name=name) for name in missing]
+                    self.db.add_all(created)
+                tags.update((tag.name, tag) for tag in created)
+            except IntegrityError:
+                # Another request created some of them first
+                tags = {tag.name: tag for tag in await self._all(select(Tag).filter(Tag.name.in_(names)))}
+        return [tags[name] for name in names]
+    
+
 class QuestionRepository(BaseRepository):
     """Question data access layer."""
     
-    def get_question_by_id(self, question_id: int) -> Optional[Question]:
+    def _base_query(self) -> Select:
+        """
+        Question query that batches everything _format_question reads.
+        
+        Authors, categories and tags are fetched with one SELECT ... IN per
+        page, so a page costs four queries no matter how many rows it holds.
+        """
+        return select(Question).options(
+            selectinload(Question.author),
+            selectinload(Question.category),
+            selectinload(Question.tags)
+        )
+    
+    async def get_question_by_id(self, question_id: int) -> Optional[Question]:
         """Get question by ID."""
-        return self.db.query(Question).filter(Question.id == question_id).first()
+        return await self._first(
+            self._base_query().filter(
+                Question.id == question_id
+            ).execution_options(populate_existing=True)
+        )
     
-    def get_all_questions(self, skip: int = 0, limit: int = 20, 
-                         category_id: Optional[int] = None) -> List[Question]:
-        """Get all questions with optional filtering."""
-        query = self.db.query(Question)
+    async def get_all_questions(self, skip: int = 0, limit: int = 20,
+                                category_id: Optional[int] = None,
+                                cursor: Optional[Cursor] = None,
+                                tag: Optional[str] = None) -> List[Question]:
+        """Get all questions with optional filtering, by offset or by keyset cursor."""
+        query = self._base_query()
         if category_id:
             query = query.filter(Question.category_id == category_id)
-        return query.order_by(Question.created_at.desc()).offset(skip).limit(limit).all()
+        if tag:
+            query = query.join(
+                question_tags, question_tags.c.question_id == Question.id
+            ).join(
+                Tag, Tag.id == question_tags.c.tag_id
+            ).filter(Tag.name == tag.strip().lower())
+        query = apply_keyset(query, Question.created_at, Question.id, cursor)
+        return await self._all(query.offset(skip).limit(limit))
     
-    def get_recent_questions(self, limit: int = 10) -> List[Question]:
+    async def get_recent_questions(self, limit: int = 10) -> List[Question]:
         """Get recently created questions."""
-        return self.db.query(Question).order_by(Question.created_at.desc()).limit(limit).all()
+        return await self._all(self._base_query().order_by(Question.created_at.desc()).limit(limit))
     
-    def get_featured_questions(self) -> List[Question]:
+    async def get_featured_questions(self) -> List[Question]:
         """Get featured questions."""
-        return self.db.query(Question).filter(Question.is_featured == True).all()
+        return await self._all(self._base_query().filter(Question.is_featured == True))
     
-    def create_question(self, question: QuestionCreate, author_id: int) -> Question:
+    async def create_question(self, question: QuestionCreate, author_id: int) -> Question:
         """Create new question."""
+        tag_repo = TagRepository(self.db)
+        tags = await tag_repo.get_or_create_tags(parse_tags(question.tags))
         db_question = Question(
             title=question.title,
             description=question.description,
             author_id=author_id,
             category_id=question.category_id,
-            tags=question.tags
+            tags=tags
         )
         self.db.add(db_question)
-        self.db.commit()
-        self.db.refresh(db_question)
-        return db_question
-    
-    def increment_view_count(self, question_id: int) -> None:
-        """Increment question view count."""
-        question = self.get_question_by_id(question_id)
-        if question:
-            question.view_count += 1
-            self.db.commit()
-    
-    def get_questions_by_author(self, author_id: int, skip: int = 0, limit: int = 20) -> List[Question]:
-        """Get questions by specific author."""
-        return self.db.query(Question).filter(
-            Question.author_id == author_id
-        ).order_by(Question.created_at.desc()).offset(skip).limit(limit).all()
-    
-    def search_questions(self, search_term: str, skip: int = 0, limit: int = 20) -> List[Question]:
-        """Search questions by title or description."""
-        return self.db.query(Question).filter(
-            (Question.title.ilike(f"%{search_term}%")) |
-            (Question.description.ilike(f"%{search_term}%"))
-        ).order_by(Question.created_at.desc()).offset(skip).limit(limit).all()
+        await self.db.flush()
+        await get_search_backend().index_question(self.db, db_question)
+        await self.db.commit()
+        await job_queue.enqueue("counters", {
+            "tags.usage_count": {tag.id: 1 for tag in tags},
+            "categories.question_count": {db_question.category_id: 1},
+            "users.question_count": {author_id: 1},
+        })
+        return await self.get_question_by_id(db_question.id)
+    
+    async def update_question(self, question: Question, changes: dict) -> Question:
+        """Apply field changes to a question and reindex it."""
+        changes = dict(changes)
+        counters = {}
+        if "tags" in changes:
+            counters["tags.usage_count"] = await self._set_tags(question, parse_tags(changes.pop("tags")))
+        if changes.get("category_id", question.category_id) != question.category_id:
+            counters["categories.question_count"] = {question.category_id: -1, changes["category_id"]: 1}
+        for field, value in changes.items():
+            setattr(question, field, value)
+        await self.db.flush()
+        if "title" in changes or "description" in changes:
+            await get_search_backend().index_question(self.db, question)
+        await self.db.commit()
+        if counters:
+            await job_queue.enqueue("counters", counters)
+        return await self.get_question_by_id(question.id)
+    
+    async def _set_tags(self, question: Question, names: List[str]) -> dict:
+        """Replace a question's tags; returns the usage count change per tag id."""
+        old_ids = {tag.id for tag in question.tags}
+        question.tags = await TagRepository(self.db).get_or_create_tags(names)
+        new_ids = {tag.id for tag in question.tags}
+        return {
+            **{tag_id: 1 for tag_id in new_ids - old_ids},
+            **{tag_id: -1 for tag_id in old_ids - new_ids}
+        }
+    
+    async def delete_question(self, question: Question) -> None:
+        """Delete a question with its answers, then adjust every counter they contributed to."""
+        answers_by_author = await self.db.execute(
+            select(Answer.author_id, func.count(Answer.id))
+            .where(Answer.question_id == question.id)
+            .group_by(Answer.author_id)
+        )
+        counters = {
+            "tags.usage_count": {tag.id: -1 for tag in question.tags},
+            "categories.question_count": {question.category_id: -1},
+            "users.question_count": {question.author_id: -1},
+            "users.answer_count": {author_id: -count for author_id, count in answers_by_author},
+        }
+        await get_search_backend().remove_question(self.db, question.id)
+        await self.db.delete(question)
+        await self.db.commit()
+        await job_queue.enqueue("counters", counters)
+    
+    async def get_questions_by_author(self, author_id: int, skip: int = 0, limit: int = 20,
+                                      cursor: Optional[Cursor] = None) -> List[Question]:
+        """Get questions by specific author, by offset or by keyset cursor."""
+        query = self._base_query().filter(Question.author_id == author_id)
+        query = apply_keyset(query, Question.created_at, Question.id, cursor)
+        return await self._all(query.offset(skip).limit(limit))
+    
+    async def get_questions_by_ids(self, ids: List[int]) -> List[Question]:
+        """Load questions in the order of ids, skipping any that no longer exist."""
+        if not ids:
+            return []
+        rows = await self._all(self._base_query().filter(Question.id.in_(ids)))
+        questions = {q.id: q for q in rows}
+        return [questions[question_id] for question_id in ids if question_id in questions]
+    
+    async def search_questions(self, search_term: str, skip: int = 0, limit: int = 20) -> List[Question]:
+        """Search questions by title or description, best match first."""
+        return await self.get_questions_by_ids(
+            await get_search_backend().search(self.db, search_term, skip, limit)
+        )
 
 class AnswerRepository(BaseRepository):
     """Answer data access layer."""
     
-    def get_answer_by_id(self, answer_id: int) -> Optional[Answer]:
+    async def get_answer_by_id(self, answer_id: int) -> Optional[Answer]:
         """Get answer by ID."""
-        return self.db.query(Answer).filter(Answer.id == answer_id).first()
+        return await self._first(
+            select(Answer).options(selectinload(Answer.author)).filter(
+                Answer.id == answer_id
+            ).execution_options(populate_existing=True)
+        )
+    
+    async def get_answers_by_question(self, question_id: int, skip: int = 0, limit: int = 50,
+                                      cursor: Optional[Cursor] = None, load_authors: bool = True) -> List[Answer]:
+        """Get answers for a question, by offset or by keyset cursor."""
+        query = select(Answer).filter(Answer.question_id == question_id)
+        if load_authors:
+            query = query.options(selectinload(Answer.author))
+        query = apply_keyset(query, Answer.created_at, Answer.id, cursor)
+        return await self._all(query.offset(skip).limit(limit))
     
-    def get_answers_by_question(self, question_id: int, skip: int = 0, limit: int = 50) -> List[Answer]:
-        """Get all answers for a question."""
-        return self.db.query(Answer).filter(
-            Answer.question_id == question_id
-        ).order_by(Answer.created_at.desc()).offset(skip).limit(limit).all()
+    async def get_answers_by_author(self, author_id: int, skip: int = 0, limit: int = 20) -> List[Answer]:
+        """Get answers written by a specific author."""
+        query = select(Answer).options(selectinload(Answer.author)).filter(
+            Answer.author_id == author_id
+        )
+        query = apply_keyset(query, Answer.created_at, Answer.id, None)
+        return await self._all(query.offset(skip).limit(limit))
     
-    def create_answer(self, answer: AnswerCreate, author_id: int) -> Answer:
+    async def create_answer(self, answer: AnswerCreate, author_id: int) -> Answer:
         """Create new answer."""
         db_answer = Answer(
             content=answer.content,
@@ -155,25 +346,151 @@ class AnswerRepository(BaseRepository):
             question_id=answer.question_id
         )
         self.db.add(db_answer)
-        self.db.commit()
-        self.db.refresh(db_answer)
-        return db_answer
-    
-    def accept_answer(self, answer_id: int) -> None:
-        """Mark answer as accepted."""
-        answer = self.get_answer_by_id(answer_id)
-        if answer:
-            answer.is_accepted = True
-            self.db.commit()
+        await self.db.flush()
+        # The question page shows answer_count, so it changes with the answer;
+        # the author's count follows in a background job
+        await self._increment(Question, answer.question_id, "answer_count", 1)
+        await self.db.commit()
+        await job_queue.enqueue("counters", {"users.answer_count": {author_id: 1}})
+        return await self.get_answer_by_id(db_answer.id)
+    
+    async def delete_answer(self, answer: Answer) -> None:
+        """Delete an answer and decrement the counters it contributed to."""
+        await self._increment(Question, answer.question_id, "answer_count", -1)
+        await self.db.delete(answer)
+        await self.db.commit()
+        await job_queue.enqueue("counters", {"users.answer_count": {answer.author_id: -1}})
+    
+    async def accept_answer(self, answer: Answer) -> List[tuple]:
+        """
+        Make answer its question's accepted answer, in the current transaction.
+        
+        Returns (id, author_id) of the answers that lost their acceptance.
+        """
+        result = await self.db.execute(
+            update(Answer)
+            .where(
+                Answer.question_id == answer.question_id,
+                Answer.id != answer.id,
+                Answer.is_accepted == True
+            )
+            .values(is_accepted=False)
+            .returning(Answer.id, Answer.author_id)
+            .execution_options(synchronize_session=False)
+        )
+        revoked = [tuple(row) for row in result.all()]
+        answer.is_accepted = True
+        await self.db.flush()
+        return revoked
+
+class VoteRepository(BaseRepository):
+    """
+    Vote data access layer.
+    
+    Votes are UPVOTE/DOWNVOTE reactions. Targets are named "question" or
+    "answer"; counters are changed with atomic SQL increments, never with
+    read-modify-write.
+    """
+    
+    TARGETS = {
+        "question": (Question, Reaction.question_id),
+        "answer": (Answer, Reaction.answer_id),
+    }
+    
+    async def get_vote(self, user_id: int, target: str, target_id: int) -> Optional[Reaction]:
+        """Get a user's vote on a target, locking it for the transaction."""
+        _, column = self.TARGETS[target]
+        return await self._first(
+            select(Reaction).filter(
+                Reaction.user_id == user_id,
+                column == target_id,
+                Reaction.reaction_type.in_(VOTE_TYPES)
+            ).with_for_update()
+        )
+    
+    async def get_votes(self, target: str, pairs: List[tuple]) -> List[Reaction]:
+        """Get existing votes for many (user_id, target_id) pairs in one query."""
+        if not pairs:
+            return []
+        _, column = self.TARGETS[target]
+        return await self._all(
+            select(Reaction).filter(
+                tuple_(Reaction.user_id, column).in_(pairs),
+                Reaction.reaction_type.in_(VOTE_TYPES)
+            ).with_for_update()
+        )
+    
+    async def get_voter_ids(self, user_ids: List[int]) -> set:
+        """Those of user_ids that belong to active users."""
+        result = await self.db.execute(select(User.id).filter(User.id.in_(user_ids), User.is_active == True))
+        return set(result.scalars().all())
+    
+    async def get_target_authors(self, target: str, target_ids: List[int]) -> dict:
+        """Map those of target_ids that exist to their author ids."""
+        model, _ = self.TARGETS[target]
+        result = await self.db.execute(select(model.id, model.author_id).filter(model.id.in_(target_ids)))
+        return dict(result.all())
+    
+    async def add_to_vote_count(self, target: str, target_id: int, delta: int) -> Optional[tuple]:
+        """Atomically add delta to a target's vote_count; returns (new count, author_id) or None if missing."""
+        model, _ = self.TARGETS[target]
+        result = await self.db.execute(
+            update(model)
+            .where(model.id == target_id)
+            .values(vote_count=model.vote_count + delta)
+            .returning(model.vote_count, model.author_id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+    
+    async def add_to_vote_counts(self, target: str, deltas: dict) -> None:
+        """Apply many vote_count deltas as one batched UPDATE, in id order."""
+        table = self.TARGETS[target][0].__table__
+        params = [
+            {"target_id": target_id, "delta": delta}
+            for target_id, delta in sorted(deltas.items())
+            if delta
+        ]
+        if params:
+            await self.db.execute(
+                table.update()
+                .where(table.c.id == bindparam("target_id"))
+                .values(vote_count=table.c.vote_count + bindparam("delta")),
+                params
+            )
 
 class CommentRepository(BaseRepository):
     """Comment data access layer."""
     
-    def get_comment_by_id(self, comment_id: int) -> Optional[Comment]:
+    async def get_comment_by_id(self, comment_id: int) -> Optional[Comment]:
         """Get comment by ID."""
-        return self.db.query(Comment).filter(Comment.id == comment_id).first()
+        return await self._first(
+            select(Comment).options(selectinload(Comment.author)).filter(
+                Comment.id == comment_id
+            ).execution_options(populate_existing=True)
+        )
+    
+    async def get_comments_for(self, question_id: int, answer_ids: List[int], per_parent: int) -> List[Comment]:
+        """
+        Oldest comments on a question and on some of its answers, at most
+        per_parent of them for each question or answer, in one query.
+        """
+        parent = Comment.question_id == question_id
+        if answer_ids:
+            parent = parent | Comment.answer_id.in_(answer_ids)
+        position = func.row_number().over(
+            partition_by=(Comment.question_id, Comment.answer_id),
+            order_by=(Comment.created_at, Comment.id)
+        ).label("position")
+        ranked = select(Comment.id, position).filter(parent).subquery()
+        return await self._all(
+            select(Comment)
+            .join(ranked, ranked.c.id == Comment.id)
+            .filter(ranked.c.position <= per_parent)
+            .order_by(Comment.created_at, Comment.id)
+        )
     
-    def create_comment(self, comment: CommentCreate, author_id: int) -> Comment:
+    async def create_comment(self, comment: CommentCreate, author_id: int) -> Comment:
         """Create new comment."""
         db_comment = Comment(
             content=comment.content,
@@ -182,33 +499,36 @@ class CommentRepository(BaseRepository):
             answer_id=comment.answer_id
         )
         self.db.add(db_comment)
-        self.db.commit()
-        self.db.refresh(db_comment)
-        return db_comment
+        await self.db.commit()
+        return await self.get_comment_by_id(db_comment.id)
 
 class EventRepository(BaseRepository):
     """Event data access layer."""
     
-    def get_all_events(self, skip: int = 0, limit: int = 20) -> List[Event]:
+    async def get_all_events(self, skip: int = 0, limit: int = 20) -> List[Event]:
         """Get all upcoming events."""
-        return self.db.query(Event).order_by(Event.start_date.asc()).offset(skip).limit(limit).all()
+        return await self._all(select(Event).order_by(Event.start_date.asc()).offset(skip).limit(limit))
     
-    def get_featured_events(self) -> List[Event]:
+    async def get_featured_events(self) -> List[Event]:
         """Get featured events."""
-        return self.db.query(Event).filter(Event.is_featured == True).all()
+        return await self._all(select(Event).filter(Event.is_featured == True))
 
 class BlogPostRepository(BaseRepository):
     """BlogPost data access layer."""
     
-    def get_published_posts(self, skip: int = 0, limit: int = 20) -> List[BlogPost]:
+    async def get_published_posts(self, skip: int = 0, limit: int = 20) -> List[BlogPost]:
         """Get published blog posts."""
-        return self.db.query(BlogPost).filter(
-            BlogPost.is_published == True
-        ).order_by(BlogPost.published_at.desc()).offset(skip).limit(limit).all()
+        return await self._all(
+            select(BlogPost).filter(
+                BlogPost.is_published == True
+            ).order_by(BlogPost.published_at.desc()).offset(skip).limit(limit)
+        )
     
-    def get_featured_posts(self) -> List[BlogPost]:
+    async def get_featured_posts(self) -> List[BlogPost]:
         """Get featured blog posts."""
-        return self.db.query(BlogPost).filter(
-            BlogPost.is_featured == True,
-            BlogPost.is_published == True
-        ).all()
+        return await self._all(
+            select(BlogPost).filter(
+                BlogPost.is_featured == True,
+                BlogPost.is_published == True
+            )
+        )
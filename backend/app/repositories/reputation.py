@@ -0,0 +1,70 @@
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.sql import select
+from app.models.models import ReputationEvent, ReputationReason
+from app.repositories.repositories import BaseRepository
+from app.utils.pagination import Cursor, apply_keyset
+
+# Points per unit of vote value (+1 up, -1 down) and per accepted answer
+REPUTATION_POINTS = {
+    ReputationReason.QUESTION_VOTE: 5,
+    ReputationReason.ANSWER_VOTE: 10,
+    ReputationReason.ANSWER_ACCEPTED: 15,
+}
+
+VOTE_REASONS = {"question": ReputationReason.QUESTION_VOTE, "answer": ReputationReason.ANSWER_VOTE}
+
+class ReputationRepository(BaseRepository):
+    """
+    Reputation ledger data access layer.
+    
+    Events are appended in the caller's transaction, next to the write
+    that earned them, and never update users: User.reputation_score is
+    only changed by the aggregator in app.db.reputation, which folds
+    pending events in batches.
+    """
+    
+    async def record(self, events: List[dict]) -> None:
+        """Append ledger events with one INSERT, in the current transaction; zero-point events are dropped."""
+        rows = [event for event in events if event["points"]]
+        if rows:
+            await self.db.execute(insert(ReputationEvent), rows)
+    
+    async def record_votes(self, target: str, votes: List[tuple]) -> None:
+        """Record (actor_id, target_id, author_id, vote_delta) changes to votes on questions or answers."""
+        reason = VOTE_REASONS[target]
+        await self.record([
+            {
+                "user_id": author_id,
+                "points": delta * REPUTATION_POINTS[reason],
+                "reason": reason,
+                "actor_id": actor_id,
+                "question_id": target_id if target == "question" else None,
+                "answer_id": target_id if target == "answer" else None,
+            }
+            for actor_id, target_id, author_id, delta in votes
+        ])
+    
+    async def record_acceptances(self, actor_id: int, question_id: int, changes: List[tuple]) -> None:
+        """Record (answer_id, author_id, accepted) changes to a question's accepted answer."""
+        points = REPUTATION_POINTS[ReputationReason.ANSWER_ACCEPTED]
+        await self.record([
+            {
+                "user_id": author_id,
+                "points": points if accepted else -points,
+                "reason": ReputationReason.ANSWER_ACCEPTED,
+                "actor_id": actor_id,
+                "question_id": question_id,
+                "answer_id": answer_id,
+            }
+            for answer_id, author_id, accepted in changes
+        ])
+    
+    async def get_user_events(self, user_id: int, limit: int = 20,
+                              cursor: Optional[Cursor] = None) -> List[ReputationEvent]:
+        """Get a user's reputation history, newest first."""
+        query = apply_keyset(
+            select(ReputationEvent).filter(ReputationEvent.user_id == user_id),
+            ReputationEvent.created_at, ReputationEvent.id, cursor
+        )
+        return await self._all(query.limit(limit))
@@ -0,0 +1,280 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event, text, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import engine
+from app.models.models import Question
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(value: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_RE.findall(value.lower()) if value else []
+
+class SearchBackend:
+    """
+    Question full-text search backend.
+    
+    Backends return question ids ordered by relevance; the repository loads
+    the rows. index_question/remove_question are called inside the
+    caller's transaction and must only take effect if it commits, so the
+    index stays in step with the questions table.
+    
+    setup() creates persistent index structures and belongs to schema
+    management (python -m app.db.init_db); start() runs on every worker
+    boot and only prepares process-local state.
+    """
+    
+    name = "base"
+    
+    async def setup(self, engine: AsyncEngine) -> None:
+        """Create the index structures (idempotent)."""
+    
+    async def start(self, engine: AsyncEngine) -> None:
+        """Prepare the backend for serving in this process."""
+    
+    async def index_question(self, db: AsyncSession, question: Question) -> None:
+        """Add or replace a question in the index."""
+    
+    async def remove_question(self, db: AsyncSession, question_id: int) -> None:
+        """Drop a question from the index."""
+    
+    async def search(self, db: AsyncSession, search_term: str, skip: int = 0, limit: int = 20) -> List[int]:
+        """Return ids of matching questions, best match first."""
+        raise NotImplementedError
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector search over a GIN expression index.
+    
+    The index is maintained by Postgres itself, so writes need no extra work.
+    Postgres has no built-in BM25; ts_rank_cd (cover density, length
+    normalised) is the closest native ranking.
+    """
+    
+    name = "postgres"
+    DOCUMENT = (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+    
+    async def setup(self, engine: AsyncEngine) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_questions_search "
+                f"ON questions USING GIN (({self.DOCUMENT}))"
+            ))
+    
+    async def search(self, db: AsyncSession, search_term: str, skip: int = 0, limit: int = 20) -> List[int]:
+        rows = await db.execute(text(
+            f"SELECT id FROM questions "
+            f"WHERE ({self.DOCUMENT}) @@ plainto_tsquery('english', :term) "
+            f"ORDER BY ts_rank_cd(({self.DOCUMENT}), plainto_tsquery('english', :term), 1) DESC, id DESC "
+            f"OFFSET :skip LIMIT :limit"
+        ), {"term": search_term, "skip": skip, "limit": limit})
+        return [row[0] for row in rows]
+
+class SqliteFtsSearchBackend(SearchBackend):
+    """FTS5 virtual table keyed by question id, ranked with bm25()."""
+    
+    name = "sqlite_fts5"
+    # Title matches count twice as much as description matches
+    RANK = "bm25(questions_fts, 2.0, 1.0)"
+    
+    async def setup(self, engine: AsyncEngine) -> None:
+        async with engine.begin() as conn:
+            exists = (await conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+            ))).first()
+            if exists:
+                return
+            await conn.execute(text(
+                "CREATE VIRTUAL TABLE questions_fts USING fts5("
+                "title, description, tokenize = 'porter unicode61')"
+            ))
+            await conn.execute(text(
+                "INSERT INTO questions_fts (rowid, title, description) "
+                "SELECT id, title, description FROM questions"
+            ))
+    
+    async def index_question(self, db: AsyncSession, question: Question) -> None:
+        await self.remove_question(db, question.id)
+        await db.execute(text(
+            "INSERT INTO questions_fts (rowid, title, description) VALUES (:id, :title, :description)"
+        ), {"id": question.id, "title": question.title, "description": question.description})
+    
+    async def remove_question(self, db: AsyncSession, question_id: int) -> None:
+        await db.execute(text("DELETE FROM questions_fts WHERE rowid = :id"), {"id": question_id})
+    
+    async def search(self, db: AsyncSession, search_term: str, skip: int = 0, limit: int = 20) -> List[int]:
+        tokens = tokenize(search_term)
+        if not tokens:
+            return []
+        # Quote every token so user input can't inject FTS5 query syntax
+        match = " ".join(f'"{token}"' for token in tokens)
+        rows = await db.execute(text(
+            f"SELECT rowid FROM questions_fts WHERE questions_fts MATCH :match "
+            f"ORDER BY {self.RANK}, rowid DESC LIMIT :limit OFFSET :skip"
+        ), {"match": match, "skip": skip, "limit": limit})
+        return [row[0] for row in rows]
+
+# Session.info key of index changes waiting for the session's commit
+PENDING_INDEX_CHANGES = "search_index_pending"
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_index_changes(session: Session) -> None:
+    for apply in session.info.pop(PENDING_INDEX_CHANGES, ()):
+        apply()
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_index_changes(session: Session, transaction) -> None:
+    # Reached without a commit when the outermost transaction rolls back
+    if transaction.parent is None:
+        session.info.pop(PENDING_INDEX_CHANGES, None)
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    Process-local inverted index with Okapi BM25 scoring.
+    
+    Used when the database offers no full-text engine. The index is built
+    from the questions table when a worker starts and updated on every
+    write, so it is only consistent within a single worker process.
+    Changes are held on the session and applied when its transaction
+    commits, so a rolled-back write never reaches the index.
+    """
+    
+    name = "memory"
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+    
+    async def start(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                select(Question.id, Question.title, Question.description)
+            )).all()
+        with self._lock:
+            for question_id, title, description in rows:
+                self._remove(question_id)
+                self._add(question_id, title, description)
+    
+    def _add(self, question_id: int, title: str, description: str) -> None:
+        terms: Dict[str, int] = defaultdict(int)
+        for token in tokenize(title):
+            terms[token] += self.TITLE_WEIGHT
+        for token in tokenize(description):
+            terms[token] += 1
+        for term, frequency in terms.items():
+            self._postings[term][question_id] = frequency
+        length = sum(terms.values())
+        self._doc_terms[question_id] = dict(terms)
+        self._doc_lengths[question_id] = length
+        self._total_length += length
+    
+    def _remove(self, question_id: int) -> None:
+        terms = self._doc_terms.pop(question_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(question_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(question_id)
+    
+    def _on_commit(self, db: AsyncSession, apply: Callable[[], None]) -> None:
+        if not db.in_transaction():
+            # Starts no I/O; gives a rollback a transaction end to drop the change at
+            db.sync_session.begin()
+        db.info.setdefault(PENDING_INDEX_CHANGES, []).append(apply)
+    
+    async def index_question(self, db: AsyncSession, question: Question) -> None:
+        question_id, title, description = question.id, question.title, question.description
+        
+        def apply():
+            with self._lock:
+                self._remove(question_id)
+                self._add(question_id, title, description)
+        
+        self._on_commit(db, apply)
+    
+    async def remove_question(self, db: AsyncSession, question_id: int) -> None:
+        def apply():
+            with self._lock:
+                self._remove(question_id)
+        
+        self._on_commit(db, apply)
+    
+    async def search(self, db: AsyncSession, search_term: str, skip: int = 0, limit: int = 20) -> List[int]:
+        tokens = set(tokenize(search_term))
+        if not tokens:
+            return []
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            postings = [self._postings.get(token, {}) for token in tokens]
+            # All terms must match, as with plainto_tsquery and FTS5 implicit AND
+            candidates = set.intersection(*(set(p) for p in postings))
+            average_length = self._total_length / doc_count
+            scores: Dict[int, float] = {}
+            for posting in postings:
+                idf = math.log((doc_count - len(posting) + 0.5) / (len(posting) + 0.5) + 1)
+                for question_id in candidates:
+                    frequency = posting[question_id]
+                    norm = 1 - self.B + self.B * self._doc_lengths[question_id] / average_length
+                    scores[question_id] = scores.get(question_id, 0.0) + (
+                        idf * frequency * (self.K1 + 1) / (frequency + self.K1 * norm)
+                    )
+        ranked = sorted(scores, key=lambda question_id: (-scores[question_id], -question_id))
+        return ranked[skip:skip + limit]
+
+def _fts5_available() -> bool:
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def create_search_backend(dialect: str, backend: str = "auto") -> SearchBackend:
+    """Pick a backend by name, or by database dialect when backend is "auto"."""
+    if backend == "auto":
+        if dialect == "postgresql":
+            backend = "postgres"
+        elif dialect == "sqlite" and _fts5_available():
+            backend = "sqlite_fts5"
+        else:
+            backend = "memory"
+    backends = {
+        "postgres": PostgresSearchBackend,
+        "sqlite_fts5": SqliteFtsSearchBackend,
+        "memory": InMemorySearchBackend,
+    }
+    if backend not in backends:
+        raise ValueError(f"Unknown search backend {backend}")
+    return backends[backend]()
+
+_search_backend: Optional[SearchBackend] = None
+
+def get_search_backend() -> SearchBackend:
+    """Return the process-wide search backend."""
+    global _search_backend
+    if _search_backend is None:
+        _search_backend = create_search_backend(engine.dialect.name, settings.SEARCH_BACKEND)
+    return _search_backend
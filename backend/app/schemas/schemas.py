@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 # User Schemas
 class UserBase(BaseModel):
@@ -24,6 +24,8 @@ class UserUpdate(BaseModel):
 class UserResponse(UserBase):
     id: int
     reputation_score: int
+    question_count: int = 0
+    answer_count: int = 0
     is_active: bool
     is_verified: bool
     avatar_url: Optional[str]
@@ -33,6 +35,61 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserSummary(BaseModel):
+    """Author fields embedded in question/answer responses."""
+    id: int
+    username: str
+    full_name: str
+    avatar_url: Optional[str] = None
+    reputation_score: int
+    
+    class Config:
+        from_attributes = True
+
+class UserPage(BaseModel):
+    """Keyset-paginated user list."""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+class LeaderboardEntry(BaseModel):
+    """One row of the reputation leaderboard."""
+    rank: int
+    user_id: int
+    username: str
+    full_name: str
+    avatar_url: Optional[str] = None
+    country: Optional[str] = None
+    reputation_score: int
+
+class UserRank(BaseModel):
+    """A user's leaderboard position overall and within their country."""
+    user_id: int
+    reputation_score: int
+    rank: int
+    total: int
+    country: Optional[str] = None
+    country_rank: Optional[int] = None
+    country_total: Optional[int] = None
+
+class ReputationEventResponse(BaseModel):
+    """One entry of a user's reputation ledger."""
+    id: int
+    points: int
+    reason: str
+    actor_id: Optional[int] = None
+    question_id: Optional[int] = None
+    answer_id: Optional[int] = None
+    folded: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ReputationEventPage(BaseModel):
+    """Keyset-paginated reputation history, newest first."""
+    items: List[ReputationEventResponse]
+    next_cursor: Optional[str] = None
+
 # Category Schemas
 class CategoryBase(BaseModel):
     name: str = Field(..., max_length=100)
@@ -51,6 +108,15 @@ class CategoryResponse(CategoryBase):
     class Config:
         from_attributes = True
 
+class CategorySummary(BaseModel):
+    """Category fields embedded in question responses."""
+    id: int
+    name: str
+    color_hex: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
 # Tag Schemas
 class TagBase(BaseModel):
     name: str = Field(..., max_length=50)
@@ -86,10 +152,12 @@ class QuestionUpdate(BaseModel):
 class QuestionResponse(QuestionBase):
     id: int
     author_id: int
-    author: UserResponse
-    category: CategoryResponse
+    author: UserSummary
+    category: CategorySummary
+    tags: List[str] = []
     view_count: int
     vote_count: int
+    answer_count: int = 0
     is_resolved: bool
     is_featured: bool
     created_at: datetime
@@ -98,6 +166,11 @@ class QuestionResponse(QuestionBase):
     class Config:
         from_attributes = True
 
+class QuestionPage(BaseModel):
+    """Keyset-paginated question list."""
+    items: List[QuestionResponse]
+    next_cursor: Optional[str] = None
+
 # Answer Schemas
 class AnswerBase(BaseModel):
     content: str = Field(..., min_length=20)
@@ -111,7 +184,7 @@ class AnswerUpdate(BaseModel):
 class AnswerResponse(AnswerBase):
     id: int
     author_id: int
-    author: UserResponse
+    author: UserSummary
     question_id: int
     vote_count: int
     is_accepted: bool
@@ -121,6 +194,11 @@ class AnswerResponse(AnswerBase):
     class Config:
         from_attributes = True
 
+class AnswerPage(BaseModel):
+    """Keyset-paginated answer list."""
+    items: List[AnswerResponse]
+    next_cursor: Optional[str] = None
+
 # Comment Schemas
 class CommentBase(BaseModel):
     content: str = Field(..., min_length=5)
@@ -145,6 +223,35 @@ class CommentResponse(CommentBase):
     class Config:
         from_attributes = True
 
+class CommentSummary(BaseModel):
+    """Comment in a question detail response; the author is listed in authors."""
+    id: int
+    content: str
+    author_id: int
+    vote_count: int
+    created_at: datetime
+    updated_at: datetime
+
+class AnswerDetail(BaseModel):
+    """Answer in a question detail response, with its comments."""
+    id: int
+    content: str
+    author_id: int
+    question_id: int
+    vote_count: int
+    is_accepted: bool
+    created_at: datetime
+    updated_at: datetime
+    comments: List[CommentSummary] = []
+
+class QuestionDetail(BaseModel):
+    """Everything a question page shows, with each author listed once."""
+    question: QuestionResponse
+    comments: List[CommentSummary]
+    answers: List[AnswerDetail]
+    next_cursor: Optional[str] = None
+    authors: List[UserSummary]
+
 # Event Schemas
 class EventBase(BaseModel):
     title: str = Field(..., max_length=255)
@@ -213,6 +320,23 @@ class ReactionCreate(BaseModel):
     answer_id: Optional[int] = None
     comment_id: Optional[int] = None
 
+# Vote Schemas
+class VoteCreate(BaseModel):
+    user_id: int
+    question_id: Optional[int] = None
+    answer_id: Optional[int] = None
+    vote: Optional[Literal["upvote", "downvote"]] = None  # None retracts the vote
+
+class VoteResponse(BaseModel):
+    vote_count: int
+    user_vote: Optional[str] = None
+
+class VoteBatchResponse(BaseModel):
+    received: int
+    applied: int
+    skipped: int
+    targets_updated: int
+
 # Token Schemas
 class Token(BaseModel):
     access_token: str
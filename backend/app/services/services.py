@@ -1,33 +1,49 @@
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Reaction, ReactionType
 from app.repositories.repositories import (
     UserRepository, CategoryRepository, QuestionRepository, 
-    AnswerRepository, CommentRepository, EventRepository, BlogPostRepository
+    AnswerRepository, CommentRepository, EventRepository, BlogPostRepository,
+    VoteRepository, TagRepository, is_unique_violation
 )
-from app.schemas.schemas import UserCreate, QuestionCreate, AnswerCreate, CommentCreate
-from app.utils.security import get_password_hash
+from app.schemas.schemas import UserCreate, QuestionCreate, QuestionUpdate, AnswerCreate, CommentCreate, VoteCreate
+from app.db.counters import question_views
+from app.db.database import SessionLocal
+from app.repositories.leaderboard import reputation_leaderboard
+from app.repositories.loaders import BatchLoader
+from app.repositories.reputation import ReputationRepository
+from app.repositories.ranking import hot_questions
+from app.utils.security import password_hasher
+from app.utils.pagination import decode_cursor, build_page
+from app.utils.cache import CacheEntry, LocalCache
+from app.utils.entity_cache import entity_cache
+from app.core.config import settings
 from typing import Optional, List
 
 class UserService:
     """User business logic."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.repository = UserRepository(db)
+        self.reputation_repo = ReputationRepository(db)
         self.db = db
     
-    def create_user(self, user: UserCreate) -> dict:
+    async def create_user(self, user: UserCreate) -> dict:
         """Create new user with password hashing."""
         # Check if user already exists
-        existing = self.repository.get_user_by_email(user.email)
+        existing = await self.repository.get_user_by_email(user.email)
         if existing:
             raise ValueError(f"User with email {user.email} already exists")
         
-        existing_username = self.repository.get_user_by_username(user.username)
+        existing_username = await self.repository.get_user_by_username(user.username)
         if existing_username:
             raise ValueError(f"Username {user.username} already taken")
         
         # Hash password and create user
-        hashed_password = get_password_hash(user.password)
-        db_user = self.repository.create_user(user, hashed_password)
+        hashed_password = await password_hasher.hash(user.password)
+        db_user = await self.repository.create_user(user, hashed_password)
+        reputation_leaderboard.add(db_user.id, db_user.reputation_score, db_user.country)
         
         return {
             "id": db_user.id,
@@ -36,9 +52,25 @@ class UserService:
             "full_name": db_user.full_name
         }
     
-    def get_user_profile(self, user_id: int) -> dict:
+    async def authenticate(self, email: str, password: str):
+        """
+        Return the user for valid credentials, else None.
+        
+        A hash made with an outdated bcrypt cost is replaced on success.
+        """
+        user = await self.repository.get_user_by_email(email)
+        if not user:
+            return None
+        valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            await self.repository.update_password_hash(user, new_hash)
+        return user
+    
+    async def get_user_profile(self, user_id: int) -> dict:
         """Get user profile information."""
-        user = self.repository.get_user_by_id(user_id)
+        user = await self.repository.get_user_by_id(user_id)
         if not user:
             raise ValueError(f"User {user_id} not found")
         
@@ -54,74 +86,325 @@ class UserService:
             "country": user.country,
             "joined_date": user.joined_date
         }
+    
+    async def get_users_page(self, cursor: str, limit: int = 100) -> dict:
+        """Get a keyset-paginated page of users."""
+        users = await self.repository.get_all_users(limit=limit + 1, cursor=decode_cursor(cursor))
+        return build_page(users, limit, lambda user: user, created_attr="joined_date")
+    
+    async def get_leaderboard(self, skip: int = 0, limit: int = 20, country: Optional[str] = None) -> List[dict]:
+        """One page of the reputation leaderboard, from the in-memory index plus one user query."""
+        rows = reputation_leaderboard.page(skip, limit, country)
+        users = {user.id: user for user in await self.repository.get_users_by_ids([row[0] for row in rows])}
+        return [
+            {
+                "rank": rank,
+                "user_id": user_id,
+                "username": users[user_id].username,
+                "full_name": users[user_id].full_name,
+                "avatar_url": users[user_id].avatar_url,
+                "country": users[user_id].country,
+                "reputation_score": score
+            }
+            for user_id, score, rank in rows
+            if user_id in users
+        ]
+    
+    async def get_user_rank(self, user_id: int) -> Optional[dict]:
+        """
+        A user's leaderboard rank, or None for unknown and inactive users.
+        
+        Users this worker has not indexed yet (registered through another
+        worker since the last rebuild) are added from the database.
+        """
+        rank = reputation_leaderboard.rank(user_id)
+        if rank is None:
+            user = await self.repository.get_user_by_id(user_id)
+            if not user or not user.is_active:
+                return None
+            reputation_leaderboard.add(user.id, user.reputation_score, user.country)
+            rank = reputation_leaderboard.rank(user_id)
+        return rank
+    
+    async def get_reputation_events_page(self, user_id: int, cursor: str, limit: int = 20) -> dict:
+        """Get a keyset-paginated page of a user's reputation history."""
+        events = await self.reputation_repo.get_user_events(user_id, limit=limit + 1, cursor=decode_cursor(cursor))
+        return build_page(events, limit, lambda event: event)
+
+# Categories change rarely and are read on almost every page
+category_cache = LocalCache("categories", ttl=settings.CATEGORY_CACHE_TTL)
 
 class CategoryService:
     """Category business logic."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.repository = CategoryRepository(db)
         self.db = db
     
-    def get_all_categories(self) -> List[dict]:
+    async def get_all_categories(self) -> List[dict]:
         """Get all categories."""
-        categories = self.repository.get_all_categories()
-        return [
-            {
-                "id": cat.id,
-                "name": cat.name,
-                "description": cat.description,
-                "icon_url": cat.icon_url,
-                "color_hex": cat.color_hex,
-                "question_count": cat.question_count
-            }
-            for cat in categories
-        ]
+        return (await self.get_all_categories_entry()).value
+    
+    async def get_all_categories_entry(self) -> CacheEntry:
+        """Get all categories through the cache."""
+        async def load():
+            categories = await self.repository.get_all_categories()
+            return [self._format_category(cat) for cat in categories]
+        
+        return await category_cache.get_or_load("all", load)
+    
+    async def get_category_entry(self, category_id: int) -> Optional[CacheEntry]:
+        """Get one category through the cache; None if it does not exist."""
+        key = f"id:{category_id}"
+        entry = category_cache.get(key)
+        if entry is None:
+            category = await self.repository.get_category_by_id(category_id)
+            if not category:
+                return None
+            entry = category_cache.set(key, self._format_category(category))
+        return entry
+    
+    async def create_category(self, **fields) -> dict:
+        """Create a category and drop cached category reads."""
+        category = await self.repository.create_category(**fields)
+        category_cache.invalidate()
+        return self._format_category(category)
+    
+    def _format_category(self, cat) -> dict:
+        """Format category response."""
+        return {
+            "id": cat.id,
+            "name": cat.name,
+            "description": cat.description,
+            "icon_url": cat.icon_url,
+            "color_hex": cat.color_hex,
+            "question_count": cat.question_count,
+            "created_at": cat.created_at
+        }
+
+class TagService:
+    """Tag business logic."""
+    
+    def __init__(self, db: AsyncSession):
+        self.repository = TagRepository(db)
+        self.db = db
+    
+    async def get_tags(self, skip: int = 0, limit: int = 50, prefix: Optional[str] = None) -> List[dict]:
+        """Get tags, most used first."""
+        tags = await self.repository.get_tags(skip, limit, prefix)
+        return [self._format_tag(tag) for tag in tags]
+    
+    def _format_tag(self, tag) -> dict:
+        """Format tag response."""
+        return {
+            "id": tag.id,
+            "name": tag.name,
+            "description": tag.description,
+            "usage_count": tag.usage_count,
+            "created_at": tag.created_at
+        }
 
 class QuestionService:
     """Question business logic."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.question_repo = QuestionRepository(db)
         self.user_repo = UserRepository(db)
         self.db = db
     
-    def create_question(self, question: QuestionCreate, author_id: int) -> dict:
+    async def create_question(self, question: QuestionCreate, author_id: int) -> dict:
         """Create new question."""
-        db_question = self.question_repo.create_question(question, author_id)
+        db_question = await self.question_repo.create_question(question, author_id)
+        hot_questions.add(db_question.id, db_question.created_at)
         return self._format_question(db_question)
     
-    def get_question(self, question_id: int) -> dict:
-        """Get question details."""
-        question = self.question_repo.get_question_by_id(question_id)
-        if not question:
-            raise ValueError(f"Question {question_id} not found")
+    async def get_question(self, question_id: int) -> dict:
+        """
+        Get question details, through the entity cache.
+        
+        Misses load from the primary even when this service reads from a
+        replica: a lagging replica would otherwise store a stale body under
+        the version the latest write just bumped to.
+        """
+        async def load():
+            async with SessionLocal() as db:
+                question = await QuestionRepository(db).get_question_by_id(question_id)
+                if not question:
+                    raise ValueError(f"Question {question_id} not found")
+                return self._format_question(question)
         
-        # Increment view count
-        self.question_repo.increment_view_count(question_id)
+        result = await entity_cache.get_or_load("question", question_id, load)
         
-        return self._format_question(question)
+        # Buffered; written to the database in bulk by the flush loop. Views
+        # do not invalidate the cached body, so its count lags by up to the TTL.
+        question_views.add(question_id)
+        hot_questions.record(question_id, views=1)
+        result["view_count"] += question_views.pending(question_id)
+        return result
+    
+    async def get_question_detail(self, question_id: int, cursor: str = "", limit: int = 20,
+                                  comments_per_parent: int = 20) -> dict:
+        """
+        Question page in one response: the question, a page of answers,
+        comments on both, and every author once.
+        
+        Answers and comments are fetched without their authors; author ids
+        are gathered from all rows and resolved by a BatchLoader in one IN
+        query, so the page costs seven queries however many answers and
+        comments it shows.
+        """
+        result = await self.get_question(question_id)
+        answers = await AnswerRepository(self.db).get_answers_by_question(
+            question_id, limit=limit + 1, cursor=decode_cursor(cursor), load_authors=False
+        )
+        page = build_page(answers, limit, self._format_answer_detail)
+        comments = await CommentRepository(self.db).get_comments_for(
+            question_id, [answer["id"] for answer in page["items"]], comments_per_parent
+        )
+        
+        by_answer = {answer["id"]: answer["comments"] for answer in page["items"]}
+        question_comments = []
+        for comment in comments:
+            formatted = self._format_comment_summary(comment)
+            if comment.answer_id is not None:
+                by_answer[comment.answer_id].append(formatted)
+            else:
+                question_comments.append(formatted)
+        
+        users = BatchLoader(self.user_repo.get_users_by_ids)
+        author_ids = [result["author_id"]]
+        author_ids += [answer["author_id"] for answer in page["items"]]
+        author_ids += [comment.author_id for comment in comments]
+        authors = await users.load_many(author_ids)
+        return {
+            "question": result,
+            "comments": question_comments,
+            "answers": page["items"],
+            "next_cursor": page["next_cursor"],
+            "authors": [self._format_author(author) for author in authors.values()]
+        }
+    
+    async def update_question(self, question_id: int, question_update: QuestionUpdate, author_id: int) -> dict:
+        """Update a question owned by author_id."""
+        question = await self._get_owned_question(question_id, author_id, "edit")
+        changes = {
+            field: value
+            for field, value in question_update.model_dump().items()
+            if value
+        }
+        updated = await self.question_repo.update_question(question, changes)
+        await entity_cache.bump("question", question_id)
+        return self._format_question(updated)
+    
+    async def delete_question(self, question_id: int, author_id: int) -> None:
+        """Delete a question owned by author_id."""
+        question = await self._get_owned_question(question_id, author_id, "delete")
+        await self.question_repo.delete_question(question)
+        hot_questions.remove(question_id)
+        await entity_cache.bump("question", question_id)
+    
+    async def _get_owned_question(self, question_id: int, author_id: int, action: str):
+        """Load a question, raising ValueError if missing and PermissionError if not owned."""
+        question = await self.question_repo.get_question_by_id(question_id)
+        if not question:
+            raise ValueError("Question not found")
+        if question.author_id != author_id:
+            raise PermissionError(f"You can only {action} your own questions")
+        return question
     
-    def get_recent_questions(self, limit: int = 10) -> List[dict]:
+    async def get_questions(self, skip: int = 0, limit: int = 20, tag: Optional[str] = None) -> List[dict]:
+        """Get questions, newest first, optionally with a given tag."""
+        questions = await self.question_repo.get_all_questions(skip, limit, tag=tag)
+        return [self._format_question(q) for q in questions]
+    
+    async def get_featured_questions(self) -> List[dict]:
+        """Get featured questions."""
+        questions = await self.question_repo.get_featured_questions()
+        return [self._format_question(q) for q in questions]
+    
+    async def get_hot_questions(self, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Get a page of the hot questions feed."""
+        questions = await self.question_repo.get_questions_by_ids(hot_questions.page(skip, limit))
+        return [self._format_question(q) for q in questions]
+    
+    async def get_recent_questions(self, limit: int = 10) -> List[dict]:
         """Get recently created questions."""
-        questions = self.question_repo.get_recent_questions(limit)
+        questions = await self.question_repo.get_recent_questions(limit)
         return [self._format_question(q) for q in questions]
     
-    def get_questions_by_category(self, category_id: int, skip: int = 0, limit: int = 20) -> List[dict]:
+    async def get_questions_by_category(self, category_id: int, skip: int = 0, limit: int = 20,
+                                        tag: Optional[str] = None) -> List[dict]:
         """Get questions by category."""
-        questions = self.question_repo.get_all_questions(skip, limit, category_id)
+        questions = await self.question_repo.get_all_questions(skip, limit, category_id, tag=tag)
         return [self._format_question(q) for q in questions]
     
-    def search_questions(self, search_term: str, skip: int = 0, limit: int = 20) -> List[dict]:
+    async def get_questions_by_author(self, author_id: int, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Get questions by author."""
+        questions = await self.question_repo.get_questions_by_author(author_id, skip, limit)
+        return [self._format_question(q) for q in questions]
+    
+    async def get_questions_page(self, cursor: str, limit: int = 20,
+                           category_id: Optional[int] = None, tag: Optional[str] = None) -> dict:
+        """Get a keyset-paginated page of questions, optionally by category and tag."""
+        questions = await self.question_repo.get_all_questions(
+            limit=limit + 1, category_id=category_id, cursor=decode_cursor(cursor), tag=tag
+        )
+        return build_page(questions, limit, self._format_question)
+    
+    async def get_author_questions_page(self, author_id: int, cursor: str, limit: int = 20) -> dict:
+        """Get a keyset-paginated page of an author's questions."""
+        questions = await self.question_repo.get_questions_by_author(
+            author_id, limit=limit + 1, cursor=decode_cursor(cursor)
+        )
+        return build_page(questions, limit, self._format_question)
+    
+    async def search_questions(self, search_term: str, skip: int = 0, limit: int = 20) -> List[dict]:
         """Search questions."""
-        questions = self.question_repo.search_questions(search_term, skip, limit)
+        questions = await self.question_repo.search_questions(search_term, skip, limit)
         return [self._format_question(q) for q in questions]
     
+    def _format_author(self, user) -> dict:
+        """Format a user as an author summary."""
+        return {
+            "id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "avatar_url": user.avatar_url,
+            "reputation_score": user.reputation_score
+        }
+    
+    def _format_answer_detail(self, answer) -> dict:
+        """Format an answer for a question detail response; comments are filled in later."""
+        return {
+            "id": answer.id,
+            "content": answer.content,
+            "author_id": answer.author_id,
+            "question_id": answer.question_id,
+            "vote_count": answer.vote_count,
+            "is_accepted": answer.is_accepted,
+            "created_at": answer.created_at,
+            "updated_at": answer.updated_at,
+            "comments": []
+        }
+    
+    def _format_comment_summary(self, comment) -> dict:
+        """Format a comment for a question detail response."""
+        return {
+            "id": comment.id,
+            "content": comment.content,
+            "author_id": comment.author_id,
+            "vote_count": comment.vote_count,
+            "created_at": comment.created_at,
+            "updated_at": comment.updated_at
+        }
+    
     def _format_question(self, question) -> dict:
         """Format question for API response."""
         return {
             "id": question.id,
             "title": question.title,
             "description": question.description,
+            "author_id": question.author_id,
             "author": {
                 "id": question.author.id,
                 "username": question.author.username,
@@ -129,15 +412,16 @@ class QuestionService:
                 "avatar_url": question.author.avatar_url,
                 "reputation_score": question.author.reputation_score
             },
+            "category_id": question.category_id,
             "category": {
                 "id": question.category.id,
                 "name": question.category.name,
                 "color_hex": question.category.color_hex
             },
-            "tags": question.tags.split(",") if question.tags else [],
+            "tags": [tag.name for tag in question.tags],
             "view_count": question.view_count,
             "vote_count": question.vote_count,
-            "answer_count": len(question.answers),
+            "answer_count": question.answer_count or 0,
             "is_resolved": question.is_resolved,
             "is_featured": question.is_featured,
             "created_at": question.created_at,
@@ -147,25 +431,72 @@ class QuestionService:
 class AnswerService:
     """Answer business logic."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.answer_repo = AnswerRepository(db)
+        self.reputation_repo = ReputationRepository(db)
         self.db = db
     
-    def create_answer(self, answer: AnswerCreate, author_id: int) -> dict:
+    async def create_answer(self, answer: AnswerCreate, author_id: int) -> dict:
         """Create new answer."""
-        db_answer = self.answer_repo.create_answer(answer, author_id)
+        db_answer = await self.answer_repo.create_answer(answer, author_id)
+        hot_questions.record(db_answer.question_id, answers=1)
+        # The question's answer_count changed
+        await entity_cache.bump("question", db_answer.question_id)
         return self._format_answer(db_answer)
     
-    def get_question_answers(self, question_id: int, skip: int = 0, limit: int = 50) -> List[dict]:
+    async def get_answer(self, answer_id: int) -> dict:
+        """Get an answer, through the entity cache; misses load from the primary, as in get_question."""
+        async def load():
+            async with SessionLocal() as db:
+                answer = await AnswerRepository(db).get_answer_by_id(answer_id)
+                if not answer:
+                    raise ValueError("Answer not found")
+                return self._format_answer(answer)
+        
+        return await entity_cache.get_or_load("answer", answer_id, load)
+    
+    async def accept_answer(self, answer, actor_id: int) -> dict:
+        """
+        Accept an answer on behalf of its question's author.
+        
+        The previously accepted answer loses its acceptance; both authors'
+        reputation events are written in the same transaction. Accepting
+        the accepted answer again changes nothing.
+        """
+        if not answer.is_accepted:
+            revoked = await self.answer_repo.accept_answer(answer)
+            await self.reputation_repo.record_acceptances(
+                actor_id, answer.question_id,
+                [(answer_id, author_id, False) for answer_id, author_id in revoked]
+                + [(answer.id, answer.author_id, True)]
+            )
+            await self.db.commit()
+            await entity_cache.bump("answer", answer.id, *[answer_id for answer_id, _ in revoked])
+        return {"is_accepted": True}
+    
+    async def get_question_answers(self, question_id: int, skip: int = 0, limit: int = 50) -> List[dict]:
         """Get all answers for a question."""
-        answers = self.answer_repo.get_answers_by_question(question_id, skip, limit)
+        answers = await self.answer_repo.get_answers_by_question(question_id, skip, limit)
+        return [self._format_answer(a) for a in answers]
+    
+    async def get_author_answers(self, author_id: int, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Get answers written by an author."""
+        answers = await self.answer_repo.get_answers_by_author(author_id, skip, limit)
         return [self._format_answer(a) for a in answers]
     
+    async def get_question_answers_page(self, question_id: int, cursor: str, limit: int = 50) -> dict:
+        """Get a keyset-paginated page of answers for a question."""
+        answers = await self.answer_repo.get_answers_by_question(
+            question_id, limit=limit + 1, cursor=decode_cursor(cursor)
+        )
+        return build_page(answers, limit, self._format_answer)
+    
     def _format_answer(self, answer) -> dict:
         """Format answer for API response."""
         return {
             "id": answer.id,
             "content": answer.content,
+            "author_id": answer.author_id,
             "author": {
                 "id": answer.author.id,
                 "username": answer.author.username,
@@ -180,19 +511,189 @@ class AnswerService:
             "updated_at": answer.updated_at
         }
 
+VOTE_VALUES = {ReactionType.UPVOTE: 1, ReactionType.DOWNVOTE: -1}
+
+class VoteService:
+    """
+    Voting business logic.
+    
+    Each user holds at most one vote per question/answer (enforced by a
+    unique index) and none on their own. Casting, flipping or retracting
+    a vote writes the reaction row, applies the net change to vote_count
+    as one SQL increment and appends the author's reputation event, all
+    in the same transaction; the score itself is updated later by the
+    aggregator.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.vote_repo = VoteRepository(db)
+        self.reputation_repo = ReputationRepository(db)
+        self.db = db
+    
+    async def vote(self, user_id: int, target: str, target_id: int,
+                   vote_type: Optional[ReactionType]) -> dict:
+        """
+        Cast (or with vote_type None, retract) a user's vote on a question or answer.
+        
+        Raises ValueError if the target does not exist and PermissionError
+        if the user wrote it.
+        """
+        try:
+            return await self._vote(user_id, target, target_id, vote_type)
+        except IntegrityError as e:
+            await self.db.rollback()
+            if not is_unique_violation(e):
+                raise
+            # A concurrent request from the same user inserted the vote first;
+            # retry against the row it created.
+            return await self._vote(user_id, target, target_id, vote_type)
+    
+    async def _vote(self, user_id: int, target: str, target_id: int,
+                    vote_type: Optional[ReactionType]) -> dict:
+        # Checked before the reaction is inserted, whose foreign key would
+        # otherwise reject a missing target
+        authors = await self.vote_repo.get_target_authors(target, [target_id])
+        if target_id not in authors:
+            raise ValueError(f"{target.capitalize()} not found")
+        if authors[target_id] == user_id:
+            raise PermissionError(f"You cannot vote on your own {target}")
+        
+        existing = await self.vote_repo.get_vote(user_id, target, target_id)
+        old_value = VOTE_VALUES[existing.reaction_type] if existing else 0
+        new_value = VOTE_VALUES[vote_type] if vote_type else 0
+        
+        if existing and not vote_type:
+            await self.db.delete(existing)
+        elif existing:
+            existing.reaction_type = vote_type
+        elif vote_type:
+            self.db.add(Reaction(user_id=user_id, reaction_type=vote_type, **{f"{target}_id": target_id}))
+        await self.db.flush()
+        
+        # Touch the (possibly hot) target row last so its lock is held briefly
+        delta = new_value - old_value
+        updated = await self.vote_repo.add_to_vote_count(target, target_id, delta)
+        if updated is None:
+            await self.db.rollback()
+            raise ValueError(f"{target.capitalize()} not found")
+        vote_count, author_id = updated
+        await self.reputation_repo.record_votes(target, [(user_id, target_id, author_id, delta)])
+        await self.db.commit()
+        if delta:
+            await entity_cache.bump(target, target_id)
+        if target == "question":
+            hot_questions.record(target_id, votes=delta)
+        
+        return {"vote_count": vote_count, "user_vote": vote_type.value if vote_type else None}
+    
+    async def ingest_votes(self, votes: List[VoteCreate]) -> dict:
+        """
+        Apply a burst of votes in one transaction.
+        
+        Votes are coalesced per (user, target) with the last one winning
+        (applied counts the distinct votes written, skipped those with no
+        or an unknown target, by an unknown or inactive user, or on the
+        voter's own post), existing votes are read in one query per target
+        type, and each target's vote_count gets a single net increment, so
+        a viral question takes one row update per batch instead of one per
+        vote. Reputation events for all the votes are appended with one
+        INSERT.
+        """
+        try:
+            return await self._ingest_votes(votes)
+        except IntegrityError as e:
+            await self.db.rollback()
+            if not is_unique_violation(e):
+                raise
+            # Some user voted through the single-vote routes meanwhile
+            return await self._ingest_votes(votes)
+    
+    async def _ingest_votes(self, votes: List[VoteCreate]) -> dict:
+        latest = {"question": {}, "answer": {}}
+        skipped = 0
+        for vote in votes:
+            if vote.question_id:
+                latest["question"][(vote.user_id, vote.question_id)] = vote.vote
+            elif vote.answer_id:
+                latest["answer"][(vote.user_id, vote.answer_id)] = vote.vote
+            else:
+                skipped += 1
+        
+        applied = 0
+        targets_updated = 0
+        question_deltas = {}
+        changed = {}
+        voters = await self.vote_repo.get_voter_ids(
+            list({user_id for wanted in latest.values() for user_id, _ in wanted})
+        )
+        for target, wanted in latest.items():
+            if not wanted:
+                continue
+            authors = await self.vote_repo.get_target_authors(
+                target, list({target_id for _, target_id in wanted})
+            )
+            valid = {
+                (user_id, target_id): vote
+                for (user_id, target_id), vote in wanted.items()
+                if user_id in voters and target_id in authors and authors[target_id] != user_id
+            }
+            skipped += len(wanted) - len(valid)
+            wanted = valid
+            column = f"{target}_id"
+            existing = {
+                (reaction.user_id, getattr(reaction, column)): reaction
+                for reaction in await self.vote_repo.get_votes(target, list(wanted))
+            }
+            deltas = defaultdict(int)
+            changes = []
+            for (user_id, target_id), vote in wanted.items():
+                vote_type = ReactionType(vote) if vote else None
+                reaction = existing.get((user_id, target_id))
+                old_value = VOTE_VALUES[reaction.reaction_type] if reaction else 0
+                new_value = VOTE_VALUES[vote_type] if vote_type else 0
+                if reaction and not vote_type:
+                    await self.db.delete(reaction)
+                elif reaction:
+                    reaction.reaction_type = vote_type
+                elif vote_type:
+                    self.db.add(Reaction(user_id=user_id, reaction_type=vote_type, **{column: target_id}))
+                deltas[target_id] += new_value - old_value
+                changes.append((user_id, target_id, authors[target_id], new_value - old_value))
+                applied += 1
+            await self.db.flush()
+            await self.reputation_repo.record_votes(target, changes)
+            await self.vote_repo.add_to_vote_counts(target, deltas)
+            targets_updated += sum(1 for delta in deltas.values() if delta)
+            changed[target] = [target_id for target_id, delta in deltas.items() if delta]
+            if target == "question":
+                question_deltas = deltas
+        await self.db.commit()
+        for target, target_ids in changed.items():
+            await entity_cache.bump(target, *target_ids)
+        for question_id, delta in question_deltas.items():
+            if delta:
+                hot_questions.record(question_id, votes=delta)
+        
+        return {
+            "received": len(votes),
+            "applied": applied,
+            "skipped": skipped,
+            "targets_updated": targets_updated
+        }
+
 class CommentService:
     """Comment business logic."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.comment_repo = CommentRepository(db)
         self.db = db
     
-    def create_comment(self, comment: CommentCreate, author_id: int) -> dict:
+    async def create_comment(self, comment: CommentCreate, author_id: int) -> dict:
         """Create new comment."""
         if not comment.question_id and not comment.answer_id:
             raise ValueError("Comment must be on either a question or answer")
         
-        db_comment = self.comment_repo.create_comment(comment, author_id)
+        db_comment = await self.comment_repo.create_comment(comment, author_id)
         return self._format_comment(db_comment)
     
     def _format_comment(self, comment) -> dict:
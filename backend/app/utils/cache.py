@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+class CacheEntry(NamedTuple):
+    """A cached value with its ETag and expiry (monotonic seconds)."""
+    value: Any
+    etag: str
+    expires_at: float
+
+def compute_etag(value: Any) -> str:
+    """Strong ETag over the JSON form of a value."""
+    payload = json.dumps(jsonable_encoder(value), sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(payload.encode()).hexdigest() + '"'
+
+class LocalCache:
+    """
+    Process-local read-through cache with a TTL and hit/miss counters.
+    
+    Writers call invalidate() after committing; the TTL bounds staleness
+    for changes made by other worker processes.
+    """
+    
+    # Every cache created in this process, by name (for metrics);
+    # ExpiringLRU instances register here too
+    registry: Dict[str, Any] = {}
+    
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        LocalCache.registry[name] = self
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return a live entry, counting the hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+    
+    def set(self, key: str, value: Any) -> CacheEntry:
+        """Store a value and return its entry."""
+        entry = CacheEntry(value, compute_etag(value), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+    
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> CacheEntry:
+        """Return the cached entry for key, loading and storing it on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.set(key, await loader())
+        return entry
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self.invalidations += 1
+    
+    def stats(self) -> dict:
+        """Hit/miss counters."""
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl
+        }
+
+class ExpiringLRU:
+    """
+    Bounded LRU whose entries also expire at their own wall-clock deadline.
+    
+    Suited to values with a natural expiry, such as verified token claims.
+    """
+    
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        LocalCache.registry[name] = self
+    
+    def get(self, key: str) -> Any:
+        """Return a live value or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store a value until expires_at (epoch seconds), evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self) -> dict:
+        """Hit/miss counters."""
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "maxsize": self.maxsize
+        }
+
+def cached_response(request: Request, entry: CacheEntry) -> Response:
+    """
+    Serve a cache entry with ETag validation.
+    
+    Clients (and CDNs) may store the body but must revalidate; a matching
+    If-None-Match gets an empty 304.
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "public, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(entry.value, headers=headers)
@@ -0,0 +1,245 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import orjson
+from app.core.config import settings
+from app.utils.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend:
+    """
+    Storage behind the EntityCache: byte values with a TTL, and counters.
+    
+    Counters are the entities' version keys; incr_many() must create a
+    missing counter at 1 and (re)set its expiry on every increment.
+    """
+    
+    name = "base"
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Values (counters as their decimal bytes) for keys; None where missing or expired."""
+        raise NotImplementedError
+    
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value for ttl seconds."""
+        raise NotImplementedError
+    
+    async def incr_many(self, keys: List[str], ttl: float) -> None:
+        """Increment counters, each expiring ttl seconds after its last increment."""
+        raise NotImplementedError
+    
+    def entries(self) -> Optional[int]:
+        """Values held, when the backend can tell cheaply."""
+        return None
+    
+    async def close(self) -> None:
+        """Release connections."""
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Process-local backend: an LRU of values plus a dict of counters.
+    
+    Counters are kept apart from the LRU so evicting values never resets
+    a version. Each worker process has its own copy, so a write only
+    invalidates the worker that made it; use it for a single worker, for
+    development and as the stand-in for Redis in tests.
+    """
+    
+    name = "memory"
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._values: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        found = []
+        with self._lock:
+            for key in keys:
+                store = self._counters if key in self._counters else self._values
+                entry = store.get(key)
+                if entry is not None and entry[1] <= now:
+                    del store[key]
+                    entry = None
+                elif entry is not None and store is self._values:
+                    self._values.move_to_end(key)
+                found.append(entry[0] if entry is not None else None)
+        return found
+    
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl)
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evictions += 1
+    
+    async def incr_many(self, keys: List[str], ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._counters) > self.maxsize:
+                self._counters = {key: entry for key, entry in self._counters.items() if entry[1] > now}
+            for key in keys:
+                entry = self._counters.get(key)
+                count = int(entry[0]) if entry is not None and entry[1] > now else 0
+                self._counters[key] = (str(count + 1).encode(), now + ttl)
+    
+    def entries(self) -> Optional[int]:
+        return len(self._values)
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend on a Redis server shared by every worker process.
+    
+    A read is one MGET and a version bump one pipelined INCR + PEXPIRE
+    per key. Needs the redis package (redis.asyncio).
+    """
+    
+    name = "redis"
+    
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the redis package installed") from e
+        # Connects lazily, on the first command
+        self.client = redis.from_url(url)
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.client.mget(keys)
+    
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+    
+    async def incr_many(self, keys: List[str], ttl: float) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.pexpire(key, max(int(ttl * 1000), 1))
+            await pipe.execute()
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+def create_cache_backend(backend: str) -> CacheBackend:
+    """Pick an entity cache backend by name."""
+    if backend == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if backend == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    raise ValueError(f"Unknown response cache backend {backend}")
+
+class EntityCache:
+    """
+    Read-through cache of formatted questions and answers, invalidated by version.
+    
+    Each entity has a version counter ("question:42:v") that every write
+    to it bumps after committing, and one cached body ("question:42")
+    stored with the version it was loaded under. A read fetches both in
+    one round trip and only uses the body if the versions match, so
+    invalidation is one increment however many readers there are, and a
+    body loaded concurrently with a write is stored under the old version
+    and never served. That only holds if loaders read the primary: a
+    replica that has not caught up would store a stale body under the
+    new version. Bodies also embed data owned by other rows (author
+    reputation, answer counts of untouched questions); the TTL bounds how
+    stale that gets.
+    
+    Backend errors are logged and counted and fall back to the database,
+    so an unreachable Redis slows reads down instead of failing them.
+    """
+    
+    KEY_PREFIX = "entity:"
+    
+    def __init__(self, name: str, backend: CacheBackend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        # Outlives any body stored under an older version, so an expired
+        # counter restarting at 0 cannot match a stale body
+        self.version_ttl = max(ttl * 10, 60.0)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+        LocalCache.registry[name] = self
+    
+    def _key(self, kind: str, entity_id: int) -> str:
+        return f"{self.KEY_PREFIX}{kind}:{entity_id}"
+    
+    def _failed(self, action: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("Entity cache %s failed on %s: %s", action, self.backend.name, error)
+    
+    async def get_or_load(self, kind: str, entity_id: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached body of an entity, calling loader() on a miss.
+        
+        The body comes back as decoded JSON (datetimes as ISO strings),
+        the same on hits and misses; exceptions from loader() propagate
+        and nothing is stored.
+        """
+        if self.ttl <= 0:
+            return await loader()
+        key = self._key(kind, entity_id)
+        try:
+            version, cached = await self.backend.get_many([f"{key}:v", key])
+        except Exception as e:
+            self._failed("read", e)
+            return orjson.loads(orjson.dumps(await loader()))
+        version = version or b"0"
+        if cached is not None:
+            cached_version, _, body = cached.partition(b":")
+            if cached_version == version:
+                self.hits += 1
+                return orjson.loads(body)
+        
+        self.misses += 1
+        body = orjson.dumps(await loader())
+        try:
+            await self.backend.set(key, version + b":" + body, self.ttl)
+        except Exception as e:
+            self._failed("write", e)
+        return orjson.loads(body)
+    
+    async def bump(self, kind: str, *entity_ids: int) -> None:
+        """Invalidate entities by bumping their versions; call after the write commits."""
+        if self.ttl <= 0 or not entity_ids:
+            return
+        try:
+            await self.backend.incr_many([f"{self._key(kind, entity_id)}:v" for entity_id in entity_ids], self.version_ttl)
+        except Exception as e:
+            # Readers may see the old body until it expires
+            self._failed("invalidation", e)
+            return
+        self.invalidations += len(entity_ids)
+    
+    async def close(self) -> None:
+        """Release the backend's connections."""
+        await self.backend.close()
+    
+    def stats(self) -> dict:
+        """Hit/miss and invalidation counters; entries only for the memory backend."""
+        return {
+            "name": self.name,
+            "backend": self.backend.name,
+            "entries": self.backend.entries(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "ttl_seconds": self.ttl
+        }
+
+# Process-wide cache of GET /questions/{id} and /answers/{id} bodies
+entity_cache = EntityCache(
+    "entities",
+    create_cache_backend(settings.RESPONSE_CACHE_BACKEND),
+    ttl=settings.RESPONSE_CACHE_TTL
+)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+from prometheus_client import (
+    REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+)
+from prometheus_client import multiprocess
+from app.core.config import settings
+from app.db.database import engine
+from app.db.jobs import job_queue
+from app.db.pool import pool_metrics
+from app.utils.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its samples to
+# memory-mapped files in that directory and a scrape of any worker
+# aggregates all of them; without it, metrics are per process.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# No *_created series: they double the series count and dashboards do not use them
+disable_created_metrics()
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum"
+)
+
+# PoolMetrics.stats() key -> metric; gauges are summed over live workers
+DB_POOL_GAUGES = {
+    stat: Gauge(f"db_pool_{name}", description, multiprocess_mode="livesum")
+    for stat, name, description in (
+        ("checked_out", "checked_out", "Connections checked out of the pool"),
+        ("idle", "idle", "Connections idle in the pool"),
+        ("pool_size", "size", "Configured pool size"),
+        ("overflow", "overflow", "Connections open beyond the pool size"),
+    )
+}
+DB_POOL_COUNTERS = {
+    stat: Counter(f"db_pool_{name}", description)
+    for stat, name, description in (
+        ("checkouts", "checkouts", "Connection checkouts"),
+        ("timeouts", "timeouts", "Checkouts that timed out waiting for a connection"),
+        ("invalidations", "invalidations", "Connections invalidated"),
+        ("wait_seconds_total", "wait_seconds", "Time spent waiting for a connection"),
+    )
+}
+
+CACHE_COUNTERS = {
+    name: Counter(f"cache_{name}", description, ["cache"])
+    for name, description in (
+        ("hits", "Cache lookups served from the cache"),
+        ("misses", "Cache lookups that missed"),
+    )
+}
+CACHE_ENTRIES = Gauge("cache_entries", "Entries held in the cache", ["cache"], multiprocess_mode="livesum")
+
+# JobQueue.stats() key -> metric. Queued jobs are the in-process queue
+# (plus retries waiting); with RQ, jobs_rq_queued is read from Redis.
+JOB_GAUGES = {
+    stat: Gauge(f"jobs_{stat}", description, multiprocess_mode="livesum")
+    for stat, description in (
+        ("queued", "Background jobs waiting in this process's queue"),
+        ("waiting_retry", "Failed background jobs waiting to be retried"),
+        ("in_flight", "Background jobs running"),
+    )
+}
+JOB_RQ_QUEUED = Gauge("jobs_rq_queued", "Background jobs waiting in the RQ queue", multiprocess_mode="max")
+JOB_COUNTERS = {
+    stat: Counter(f"jobs_{stat}", description)
+    for stat, description in (
+        ("enqueued", "Background jobs enqueued"),
+        ("completed", "Background jobs completed"),
+        ("duplicates", "Background jobs skipped because their idempotency key had completed"),
+        ("retried", "Background job attempts that failed and were retried"),
+        ("failed", "Background jobs dropped after their last attempt failed"),
+    )
+}
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request latency and in-flight requests.
+    
+    Requests are labelled with the matched route template (not the raw
+    path), so label cardinality is bounded by the number of routes;
+    requests that match no route share the "unmatched" label.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
+
+class MetricsExporter:
+    """
+    Copies process-local stats (pool, caches, job queue) into Prometheus metrics.
+    
+    The pool and caches keep plain integer counters so their hot paths
+    stay cheap; this samples them every interval seconds (and before each
+    scrape of this worker), turning counter growth into Counter.inc
+    deltas that multiprocess mode can sum across workers.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last: Dict[tuple, float] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def _advance(self, counter, key: tuple, value: float) -> None:
+        delta = value - self._last.get(key, 0)
+        if delta > 0:
+            counter.inc(delta)
+        self._last[key] = value
+    
+    def sample(self) -> None:
+        """Publish the current pool, cache and job queue stats."""
+        pool = pool_metrics.stats(engine.sync_engine.pool)
+        for stat, gauge in DB_POOL_GAUGES.items():
+            # None for pools without a queue (SQLite)
+            gauge.set(pool[stat] or 0)
+        for stat, counter in DB_POOL_COUNTERS.items():
+            self._advance(counter, ("db", stat), pool[stat])
+        
+        for name, cache in list(LocalCache.registry.items()):
+            stats = cache.stats()
+            # None for caches that cannot count entries cheaply (Redis)
+            CACHE_ENTRIES.labels(name).set(stats["entries"] or 0)
+            for stat, counter in CACHE_COUNTERS.items():
+                self._advance(counter.labels(name), ("cache", name, stat), stats[stat])
+        
+        jobs = job_queue.stats()
+        for stat, gauge in JOB_GAUGES.items():
+            gauge.set(jobs[stat])
+        if jobs.get("rq_queued") is not None:
+            JOB_RQ_QUEUED.set(jobs["rq_queued"])
+        for stat, counter in JOB_COUNTERS.items():
+            self._advance(counter, ("jobs", stat), jobs[stat])
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Sampling metrics failed")
+            await asyncio.sleep(self.interval)
+    
+    def start(self) -> None:
+        """Keep sampling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def render(self) -> bytes:
+        """Prometheus text exposition of every worker's metrics (or this process's)."""
+        self.sample()
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(REGISTRY)
+
+# Process-wide exporter, started by the app lifespan
+metrics_exporter = MetricsExporter(interval=settings.METRICS_SAMPLE_INTERVAL)
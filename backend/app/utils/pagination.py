@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple, List, Any, Callable
+from sqlalchemy import tuple_
+
+# A decoded keyset position: (created_at, id) of the last row of the previous page
+Cursor = Tuple[datetime, int]
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Optional[Cursor]:
+    """
+    Decode a token produced by encode_cursor.
+    
+    An empty token means "first page". Raises ValueError for malformed tokens.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError("Invalid pagination cursor")
+
+def apply_keyset(query, created_column, id_column, cursor: Optional[Cursor]):
+    """Order a query newest-first on (created, id) and seek past the cursor."""
+    if cursor:
+        created_at, row_id = cursor
+        query = query.filter(tuple_(created_column, id_column) < tuple_(created_at, row_id))
+    return query.order_by(created_column.desc(), id_column.desc())
+
+def build_page(rows: List[Any], limit: int, format_item: Callable[[Any], Any],
+               created_attr: str = "created_at") -> dict:
+    """
+    Build a page response from up to limit + 1 rows.
+    
+    The extra row only signals that another page exists; it is not returned.
+    """
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, created_attr), last.id)
+    return {"items": [format_item(row) for row in items], "next_cursor": next_cursor}
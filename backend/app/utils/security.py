@@ -1,23 +1,138 @@
-from passlib.context import CryptContext
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt and jose are imported on first use rather than at import
+# time: most workers never hash a password themselves (the hasher pool
+# does), and keeping them off the import path shortens worker boot.
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Password hashing context. Hashes made with a different cost are flagged for rehash."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; on success also return a new hash if the stored one uses an outdated cost."""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool.
+    
+    At most `workers` hashes run at once, on their own cores, so a login
+    spike cannot starve the event loop or the request threadpool. Beyond
+    `max_pending` in-flight requests new ones are rejected with
+    PasswordHasherBusy rather than queueing without bound. If a worker
+    dies (OOM kill, segfault) the pool is broken for good: the requests
+    in it get PasswordHasherBusy and the next one starts a new pool.
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.restarts = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs an event loop and driver threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call builds a new one (once, however many calls saw it break)."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress, try again shortly")
+        self._pending += 1
+        executor = self._get_executor()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise PasswordHasherBusy("Password hashing workers restarted, try again shortly")
+        finally:
+            self._pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop."""
+        return await self._run(get_password_hash, password)
+    
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password off the event loop; see verify_and_update_password."""
+        valid, new_hash = await self._run(verify_and_update_password, password, hashed_password)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    def stats(self) -> dict:
+        """Queue depth and throughput counters."""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "restarts": self.restarts,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS
+        }
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
 
 # JWT Token generation
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -36,6 +151,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode JWT access token."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(
             token,
@@ -0,0 +1,14 @@
+from typing import Any
+from fastapi.responses import ORJSONResponse
+
+def trusted_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    """
+    Encode service output straight to JSON with orjson.
+    
+    Returning a Response makes FastAPI skip response_model validation and
+    its jsonable_encoder pass, so each item is built once (by the service's
+    _format_* method) and encoded once. Only use it for data those methods
+    produce; they already match the route's declared response_model, which
+    is still what the OpenAPI schema documents.
+    """
+    return ORJSONResponse(content, status_code=status_code)
@@ -0,0 +1,258 @@
+"""
+Closed-loop HTTP load test for the API.
+
+    python -m benchmarks.load --duration 30 --concurrency 32 --write-ratio 0.1
+    python -m benchmarks.load --base-url http://localhost:8000 --json after.json
+
+Without --base-url the app is driven in-process through httpx's ASGI
+transport (no network, one event loop), which is handy for before/after
+comparisons of a single change; point it at a real server to include
+uvicorn and multiple workers. Reads favour hot questions with the same
+Zipf skew the seeder uses. Run `python -m benchmarks.seed` first.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import httpx
+from benchmarks.seed import Picker, WORDS, PASSWORD
+
+API = "/api/v1"
+
+class Request(NamedTuple):
+    method: str
+    url: str
+    body: Optional[dict] = None
+    token: Optional[str] = None
+
+class Scenario(NamedTuple):
+    name: str
+    weight: float
+    write: bool
+    build: Callable[["Workload"], Request]
+
+class Workload:
+    """Ids discovered from the running API, sampled with skew."""
+    
+    def __init__(self, rng: random.Random, users: List[int], categories: List[int],
+                 questions: List[int], answers: List[int], tags: List[str], tokens: List[str]):
+        self.rng = rng
+        self.users = Picker(rng, users, 1.1)
+        self.categories = categories
+        self.questions = Picker(rng, questions, 1.1)
+        self.answers = Picker(rng, answers, 1.1) if answers else None
+        self.tags = tags
+        self.tokens = tokens
+        self.cursors: List[str] = []
+    
+    def token(self) -> str:
+        """Bearer token of a random logged-in user."""
+        return self.rng.choice(self.tokens)
+    
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+SCENARIOS = [
+    # Reads
+    Scenario("GET /questions/", 10, False,
+             lambda w: Request("GET", f"{API}/questions/?limit=20")),
+    Scenario("GET /questions/?cursor", 6, False,
+             lambda w: Request("GET", f"{API}/questions/?limit=20&cursor={w.rng.choice(w.cursors or [''])}")),
+    Scenario("GET /questions/hot", 8, False,
+             lambda w: Request("GET", f"{API}/questions/hot?limit=20")),
+    Scenario("GET /questions/{id}", 25, False,
+             lambda w: Request("GET", f"{API}/questions/{w.questions.pick()}")),
+    Scenario("GET /questions/{id}/full", 10, False,
+             lambda w: Request("GET", f"{API}/questions/{w.questions.pick()}/full")),
+    Scenario("GET /answers/?question_id", 15, False,
+             lambda w: Request("GET", f"{API}/answers/?question_id={w.questions.pick()}")),
+    Scenario("GET /questions/?search", 6, False,
+             lambda w: Request("GET", f"{API}/questions/?search={w.words(w.rng.randint(1, 2))}")),
+    Scenario("GET /questions/?tag", 4, False,
+             lambda w: Request("GET", f"{API}/questions/?tag={w.rng.choice(w.tags or ['visa'])}")),
+    Scenario("GET /questions/?category_id", 6, False,
+             lambda w: Request("GET", f"{API}/questions/?category_id={w.rng.choice(w.categories)}")),
+    Scenario("GET /categories/", 8, False,
+             lambda w: Request("GET", f"{API}/categories/")),
+    Scenario("GET /tags/", 3, False,
+             lambda w: Request("GET", f"{API}/tags/")),
+    Scenario("GET /users/{id}", 5, False,
+             lambda w: Request("GET", f"{API}/users/{w.users.pick()}")),
+    Scenario("GET /users/{id}/questions", 3, False,
+             lambda w: Request("GET", f"{API}/users/{w.users.pick()}/questions")),
+    Scenario("GET /users/leaderboard", 2, False,
+             lambda w: Request("GET", f"{API}/users/leaderboard")),
+    Scenario("GET /users/{id}/rank", 2, False,
+             lambda w: Request("GET", f"{API}/users/{w.users.pick()}/rank")),
+    # Writes
+    Scenario("POST /questions/{id}/upvote", 40, True,
+             lambda w: Request("POST", f"{API}/questions/{w.questions.pick()}/upvote", token=w.token())),
+    Scenario("POST /answers/{id}/upvote", 20, True,
+             lambda w: Request("POST", f"{API}/answers/{w.answers.pick() if w.answers else 1}/upvote", token=w.token())),
+    Scenario("POST /answers/", 25, True,
+             lambda w: Request("POST", f"{API}/answers/", {
+                 "question_id": w.questions.pick(),
+                 "content": f"You can try {w.words(12)}"
+             }, w.token())),
+    Scenario("POST /questions/", 15, True,
+             lambda w: Request("POST", f"{API}/questions/", {
+                 "title": f"Question about {w.words(4)}",
+                 "description": f"I need help with {w.words(20)}",
+                 "category_id": w.rng.choice(w.categories),
+                 "tags": ",".join(w.rng.sample(w.tags, min(2, len(w.tags))))
+             }, w.token())),
+]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def discover(client: httpx.AsyncClient, rng: random.Random, auth_users: int) -> Workload:
+    """Collect ids to drive the workload with and log in some seeded users."""
+    user_rows = (await client.get(f"{API}/users/?limit=1000")).json()
+    users = [user["id"] for user in user_rows]
+    tokens = []
+    for user in rng.sample(user_rows, min(auth_users, len(user_rows))):
+        response = await client.post(f"{API}/users/login", params={"email": user["email"], "password": PASSWORD})
+        if response.status_code == 200:
+            tokens.append(response.json()["access_token"])
+    categories = [category["id"] for category in (await client.get(f"{API}/categories/")).json()]
+    tags = [tag["name"] for tag in (await client.get(f"{API}/tags/?limit=100")).json()]
+    questions: List[int] = []
+    cursors: List[str] = []
+    cursor = ""
+    for _ in range(25):
+        page = (await client.get(f"{API}/questions/?limit=100&cursor={cursor}")).json()
+        questions.extend(question["id"] for question in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+        cursors.append(cursor)
+    answers: List[int] = []
+    for question_id in questions[:50]:
+        answers.extend(answer["id"] for answer in (await client.get(f"{API}/answers/?question_id={question_id}")).json())
+    if not users or not categories or not questions:
+        raise SystemExit("The database is empty; run `python -m benchmarks.seed` first")
+    if not tokens:
+        raise SystemExit(f"Could not log in any user with the seeded password {PASSWORD!r}")
+    workload = Workload(rng, users, categories, questions, answers, tags, tokens)
+    workload.cursors = cursors
+    return workload
+
+async def run(args: argparse.Namespace, client: httpx.AsyncClient) -> dict:
+    rng = random.Random(args.seed)
+    workload = await discover(client, rng, args.auth_users)
+    reads = [scenario for scenario in SCENARIOS if not scenario.write]
+    writes = [scenario for scenario in SCENARIOS if scenario.write]
+    read_weights = [scenario.weight for scenario in reads]
+    write_weights = [scenario.weight for scenario in writes]
+    
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    measuring = False
+    
+    async def worker(deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            if rng.random() < args.write_ratio:
+                scenario = rng.choices(writes, weights=write_weights)[0]
+            else:
+                scenario = rng.choices(reads, weights=read_weights)[0]
+            request = scenario.build(workload)
+            start = time.perf_counter()
+            try:
+                headers = {"Authorization": f"Bearer {request.token}"} if request.token else None
+                response = await client.request(request.method, request.url, json=request.body, headers=headers)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - start
+            if measuring:
+                latencies[scenario.name].append(elapsed)
+                if failed:
+                    errors[scenario.name] += 1
+    
+    if args.warmup:
+        await asyncio.gather(*(worker(time.perf_counter() + args.warmup) for _ in range(args.concurrency)))
+    measuring = True
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + args.duration) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    endpoints = {}
+    for name in sorted(latencies, key=lambda name: -len(latencies[name])):
+        values = sorted(latencies[name])
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "write_ratio": args.write_ratio,
+        },
+        "total": {
+            "requests": len(all_values),
+            "errors": sum(errors.values()),
+            "rps": len(all_values) / elapsed,
+            "p50_ms": percentile(all_values, 0.50) * 1000,
+            "p95_ms": percentile(all_values, 0.95) * 1000,
+            "p99_ms": percentile(all_values, 0.99) * 1000,
+        },
+        "endpoints": endpoints,
+    }
+
+def print_report(report: dict) -> None:
+    header = f"{'endpoint':34} {'reqs':>7} {'errs':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    rows: List[Tuple[str, dict]] = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:34} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a mixed read/write load test against the API.")
+    parser.add_argument("--base-url", help="server to test; default drives the app in-process")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="fraction of requests that write")
+    parser.add_argument("--auth-users", type=int, default=20, help="seeded users to log in for writes")
+    parser.add_argument("--seed", type=int, default=7, help="random seed")
+    parser.add_argument("--json", help="also write the report to this file")
+    return parser.parse_args()
+
+async def main() -> None:
+    args = parse_args()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+            report = await run(args, client)
+    else:
+        from app.main import create_app
+        app = create_app()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+                report = await run(args, client)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
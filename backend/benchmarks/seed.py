@@ -0,0 +1,361 @@
+"""
+Seed the database with synthetic, production-shaped data.
+
+    python -m benchmarks.seed --users 2000 --questions 20000 --reset
+
+Activity is Zipf-distributed: a few power users write most questions and
+answers, and a few hot questions collect most answers, votes and views.
+Rows are written with batched Core INSERTs and explicit ids, so counters
+(vote_count, question_count, usage_count, ...) are computed up front and
+match the inserted rows; every vote and accepted answer gets a folded
+reputation ledger event that adds up to the authors' scores.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.db.database import engine, Base, SessionLocal
+from app.models.models import (
+    User, Category, Tag, Question, Answer, Comment, Reaction, ReactionType, ReputationEvent, ReputationReason,
+    question_tags
+)
+from app.repositories.reputation import REPUTATION_POINTS
+from app.repositories.search import get_search_backend
+from app.utils.security import get_password_hash
+
+BATCH_SIZE = 2000
+PASSWORD = "password123"
+
+WORDS = (
+    "visa arc bank account phone plan housing deposit jeonse wolse rent landlord "
+    "hospital insurance tax refund job contract teacher e2 f6 d10 topik korean "
+    "language school subway bus seoul busan incheon daegu market delivery coupang "
+    "naver kakao pharmacy clinic dentist gym apartment officetel utility gas "
+    "internet immigration office passport license driving car taxi airport "
+    "restaurant food kimchi festival weekend hiking travel family school kids"
+).split()
+
+CATEGORIES = [
+    ("Visa & Immigration", "#0D9488"), ("Housing", "#2563EB"), ("Banking", "#7C3AED"),
+    ("Healthcare", "#DC2626"), ("Jobs", "#EA580C"), ("Language", "#16A34A"),
+    ("Transport", "#0891B2"), ("Food", "#CA8A04"), ("Family", "#DB2777"),
+    ("Travel", "#4F46E5"), ("Shopping", "#65A30D"), ("Telecom", "#9333EA"),
+]
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    """Cumulative weights for random.choices where rank 1 is the most popular."""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+class Picker:
+    """Draw ids with Zipf skew over a shuffled ranking."""
+    
+    def __init__(self, rng: random.Random, ids: List[int], exponent: float):
+        self.rng = rng
+        self.ranked = list(ids)
+        rng.shuffle(self.ranked)
+        self.cum_weights = zipf_weights(len(self.ranked), exponent)
+    
+    def pick(self) -> int:
+        return self.rng.choices(self.ranked, cum_weights=self.cum_weights)[0]
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+async def _next_id(conn: AsyncConnection, model) -> int:
+    return ((await conn.execute(select(func.max(model.id)))).scalar() or 0) + 1
+
+async def _insert(conn: AsyncConnection, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await conn.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+async def _reset_sequences(conn: AsyncConnection) -> None:
+    """Move Postgres id sequences past the explicitly inserted ids."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in ("users", "categories", "tags", "questions", "answers", "comments", "reactions"):
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {table}), 1))"
+        ))
+
+async def seed(args: argparse.Namespace) -> Dict[str, int]:
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    start = now - timedelta(days=args.days)
+    
+    def timestamp(fraction: float) -> datetime:
+        return start + (now - start) * fraction
+    
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+            if conn.dialect.name == "sqlite":
+                await conn.execute(text("DROP TABLE IF EXISTS questions_fts"))
+        await conn.run_sync(Base.metadata.create_all)
+    search = get_search_backend()
+    await search.setup(engine)
+    
+    async with engine.begin() as conn:
+        hashed_password = get_password_hash(PASSWORD)
+        
+        # Users
+        first_user = await _next_id(conn, User)
+        user_ids = list(range(first_user, first_user + args.users))
+        users = Picker(rng, user_ids, args.skew)
+        reputation = defaultdict(int)
+        user_rows = [
+            {
+                "id": user_id,
+                "email": f"user{user_id}@example.com",
+                "username": f"user{user_id}",
+                "full_name": f"User {user_id}",
+                "hashed_password": hashed_password,
+                "country": rng.choice(["South Korea", "USA", "Vietnam", "Uzbekistan", "Philippines"]),
+                "joined_date": timestamp(index / max(args.users, 1) * 0.5),
+            }
+            for index, user_id in enumerate(user_ids)
+        ]
+        
+        # Categories and tags
+        first_category = await _next_id(conn, Category)
+        category_ids = list(range(first_category, first_category + args.categories))
+        categories = Picker(rng, category_ids, 1.0)
+        category_rows = [
+            {
+                "id": category_id,
+                "name": CATEGORIES[index % len(CATEGORIES)][0] + (
+                    f" {category_id}" if category_id > len(CATEGORIES) else ""
+                ),
+                "color_hex": CATEGORIES[index % len(CATEGORIES)][1],
+                "description": sentence(rng, 5, 12),
+                "question_count": 0,
+            }
+            for index, category_id in enumerate(category_ids)
+        ]
+        category_counts = defaultdict(int)
+        
+        first_tag = await _next_id(conn, Tag)
+        tag_ids = list(range(first_tag, first_tag + args.tags))
+        tags = Picker(rng, tag_ids, 1.1)
+        tag_usage = defaultdict(int)
+        
+        # Questions: created in id order so keyset pagination sees a realistic timeline
+        first_question = await _next_id(conn, Question)
+        question_ids = list(range(first_question, first_question + args.questions))
+        questions = Picker(rng, question_ids, args.skew)
+        question_created = {}
+        question_rows = []
+        question_tag_rows = []
+        for index, question_id in enumerate(question_ids):
+            created_at = timestamp(0.5 + 0.5 * index / max(args.questions, 1))
+            question_created[question_id] = created_at
+            category_id = categories.pick()
+            category_counts[category_id] += 1
+            question_rows.append({
+                "id": question_id,
+                "title": f"How do I handle {sentence(rng, 3, 8)}?",
+                "description": sentence(rng, 20, 80),
+                "author_id": users.pick(),
+                "category_id": category_id,
+                "view_count": 0,
+                "vote_count": 0,
+                "is_resolved": rng.random() < 0.3,
+                "is_featured": rng.random() < 0.01,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for tag_id in {tags.pick() for _ in range(rng.randint(0, 4))}:
+                question_tag_rows.append({"question_id": question_id, "tag_id": tag_id})
+                tag_usage[tag_id] += 1
+        
+        # Answers concentrate on hot questions
+        first_answer = await _next_id(conn, Answer)
+        answer_ids = list(range(first_answer, first_answer + args.answers))
+        answer_rows = []
+        answer_question = {}
+        for answer_id in answer_ids:
+            question_id = questions.pick()
+            answer_question[answer_id] = question_id
+            created_at = question_created[question_id] + (now - question_created[question_id]) * rng.random() ** 3
+            answer_rows.append({
+                "id": answer_id,
+                "content": sentence(rng, 15, 60),
+                "author_id": users.pick(),
+                "question_id": question_id,
+                "vote_count": 0,
+                "is_accepted": False,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        answers = Picker(rng, answer_ids, args.skew) if answer_ids else None
+        
+        # Comments, mostly on questions
+        first_comment = await _next_id(conn, Comment)
+        comment_rows = []
+        for comment_id in range(first_comment, first_comment + args.comments):
+            on_answer = answers is not None and rng.random() < 0.4
+            comment_rows.append({
+                "id": comment_id,
+                "content": sentence(rng, 5, 25),
+                "author_id": users.pick(),
+                "question_id": None if on_answer else questions.pick(),
+                "answer_id": answers.pick() if on_answer else None,
+                "vote_count": 0,
+                "created_at": timestamp(0.5 + 0.5 * rng.random()),
+                "updated_at": now,
+            })
+        
+        # Reactions: at most one vote per user per target, as the unique indexes require
+        first_reaction = await _next_id(conn, Reaction)
+        reaction_rows = []
+        seen_votes = set()
+        question_votes = defaultdict(int)
+        answer_votes = defaultdict(int)
+        authors = {row["id"]: row["author_id"] for row in question_rows}
+        answer_authors = {row["id"]: row["author_id"] for row in answer_rows}
+        reputation_rows = []
+        
+        def earn(user_id, reason, value, actor_id, question_id, answer_id, created_at):
+            points = REPUTATION_POINTS[reason] * value
+            reputation[user_id] += points
+            reputation_rows.append({
+                "user_id": user_id,
+                "points": points,
+                "reason": reason,
+                "actor_id": actor_id,
+                "question_id": question_id,
+                "answer_id": answer_id,
+                "folded": True,
+                "created_at": created_at,
+            })
+        
+        attempts = 0
+        while len(reaction_rows) < args.reactions and attempts < args.reactions * 3:
+            attempts += 1
+            user_id = rng.choice(user_ids)
+            on_answer = answers is not None and rng.random() < 0.4
+            target = "answer" if on_answer else "question"
+            target_id = answers.pick() if on_answer else questions.pick()
+            roll = rng.random()
+            if roll < 0.75:
+                reaction_type = ReactionType.UPVOTE
+            elif roll < 0.85:
+                reaction_type = ReactionType.DOWNVOTE
+            else:
+                reaction_type = rng.choice([ReactionType.USEFUL, ReactionType.BOOKMARK])
+            if reaction_type in (ReactionType.UPVOTE, ReactionType.DOWNVOTE):
+                # VoteService refuses votes on one's own post
+                if user_id == (answer_authors if on_answer else authors)[target_id]:
+                    continue
+                if (user_id, target, target_id) in seen_votes:
+                    continue
+                seen_votes.add((user_id, target, target_id))
+                created_at = timestamp(0.5 + 0.5 * rng.random())
+                value = 1 if reaction_type == ReactionType.UPVOTE else -1
+                if on_answer:
+                    answer_votes[target_id] += value
+                    earn(answer_authors[target_id], ReputationReason.ANSWER_VOTE, value,
+                         user_id, None, target_id, created_at)
+                else:
+                    question_votes[target_id] += value
+                    earn(authors[target_id], ReputationReason.QUESTION_VOTE, value,
+                         user_id, target_id, None, created_at)
+            else:
+                created_at = timestamp(0.5 + 0.5 * rng.random())
+            reaction_rows.append({
+                "id": first_reaction + len(reaction_rows),
+                "user_id": user_id,
+                "question_id": None if on_answer else target_id,
+                "answer_id": target_id if on_answer else None,
+                "reaction_type": reaction_type,
+                "created_at": created_at,
+            })
+        
+        # Denormalised counters
+        user_questions = Counter(row["author_id"] for row in question_rows)
+        user_answers = Counter(row["author_id"] for row in answer_rows)
+        for row in user_rows:
+            row["question_count"] = user_questions[row["id"]]
+            row["answer_count"] = user_answers[row["id"]]
+        for row in category_rows:
+            row["question_count"] = category_counts[row["id"]]
+        tag_rows = [
+            {"id": tag_id, "name": f"{rng.choice(WORDS)}-{tag_id}", "usage_count": tag_usage[tag_id]}
+            for tag_id in tag_ids
+        ]
+        answered = defaultdict(list)
+        for row in answer_rows:
+            row["vote_count"] = answer_votes[row["id"]]
+            answered[row["question_id"]].append(row)
+        for row in question_rows:
+            row["vote_count"] = question_votes[row["id"]]
+            row["answer_count"] = len(answered[row["id"]])
+            row["view_count"] = rng.randint(0, 20) + 15 * len(answered[row["id"]]) + 3 * abs(row["vote_count"])
+            if row["is_resolved"] and answered[row["id"]]:
+                accepted = max(answered[row["id"]], key=lambda answer: answer["vote_count"])
+                accepted["is_accepted"] = True
+                earn(accepted["author_id"], ReputationReason.ANSWER_ACCEPTED, 1,
+                     row["author_id"], row["id"], accepted["id"], accepted["updated_at"])
+        for row in user_rows:
+            row["reputation_score"] = reputation[row["id"]]
+        
+        for table, rows in (
+            (User.__table__, user_rows),
+            (Category.__table__, category_rows),
+            (Tag.__table__, tag_rows),
+            (Question.__table__, question_rows),
+            (question_tags, question_tag_rows),
+            (Answer.__table__, answer_rows),
+            (Comment.__table__, comment_rows),
+            (Reaction.__table__, reaction_rows),
+            (ReputationEvent.__table__, reputation_rows),
+        ):
+            await _insert(conn, table, rows)
+        await _reset_sequences(conn)
+    
+    async with SessionLocal() as db:
+        for row in question_rows:
+            await search.index_question(db, SimpleNamespace(**row))
+        await db.commit()
+    
+    return {
+        "users": len(user_rows),
+        "categories": len(category_rows),
+        "tags": len(tag_rows),
+        "questions": len(question_rows),
+        "answers": len(answer_rows),
+        "comments": len(comment_rows),
+        "reactions": len(reaction_rows),
+        "reputation events": len(reputation_rows),
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic data.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=10000)
+    parser.add_argument("--answers", type=int, default=30000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--reactions", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365, help="history length")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for users and questions")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    return parser.parse_args()
+
+async def main() -> None:
+    args = parse_args()
+    counts = await seed(args)
+    await engine.dispose()
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+    print(f"Every user's password is {PASSWORD!r}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
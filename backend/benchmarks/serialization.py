@@ -0,0 +1,80 @@
+"""
+Per-item cost of serializing question list pages.
+
+    python -m benchmarks.serialization --items 100 --rounds 200
+
+Compares FastAPI's default path (validate the service dicts against
+response_model, run jsonable_encoder, encode with json) with
+trusted_response (encode the service dicts once with orjson). Both start
+from the same ORM-like rows and include _format_question.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.schemas.schemas import QuestionResponse
+from app.services.services import QuestionService
+from app.utils.serialization import trusted_response
+
+def make_rows(count: int) -> List[SimpleNamespace]:
+    now = datetime.utcnow()
+    author = SimpleNamespace(id=7, username="user7", full_name="User Seven",
+                             avatar_url=None, reputation_score=1234)
+    category = SimpleNamespace(id=3, name="Housing", color_hex="#2563EB")
+    return [
+        SimpleNamespace(
+            id=question_id,
+            title=f"How do I get a deposit back from my landlord? ({question_id})",
+            description="My contract ended last month and the landlord is not returning the jeonse deposit. " * 3,
+            author_id=author.id,
+            author=author,
+            category_id=category.id,
+            category=category,
+            tags=[SimpleNamespace(name=name) for name in ("housing", "jeonse", "contract")],
+            view_count=question_id * 13,
+            vote_count=question_id % 17,
+            answer_count=question_id % 5,
+            is_resolved=False,
+            is_featured=False,
+            created_at=now - timedelta(minutes=question_id),
+            updated_at=now,
+        )
+        for question_id in range(1, count + 1)
+    ]
+
+async def validated(service: QuestionService, rows: List[SimpleNamespace], field) -> bytes:
+    content = await serialize_response(field=field, response_content=[service._format_question(q) for q in rows])
+    return JSONResponse(content).body
+
+async def trusted(service: QuestionService, rows: List[SimpleNamespace], field) -> bytes:
+    return trusted_response([service._format_question(q) for q in rows]).body
+
+async def measure(label: str, func, service, rows, field, rounds: int) -> float:
+    await func(service, rows, field)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await func(service, rows, field)
+    per_item = (time.perf_counter() - start) / (rounds * len(rows)) * 1e6
+    print(f"{label:40} {per_item:8.2f} us/item {per_item * len(rows) / 1000:8.3f} ms/page")
+    return per_item
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure question list serialization cost.")
+    parser.add_argument("--items", type=int, default=100, help="items per page")
+    parser.add_argument("--rounds", type=int, default=200, help="pages to serialize per path")
+    args = parser.parse_args()
+    
+    rows = make_rows(args.items)
+    service = QuestionService(None)
+    field = create_response_field(name="response", type_=List[QuestionResponse])
+    baseline = await measure("response_model validation + json", validated, service, rows, field, args.rounds)
+    fast = await measure("trusted_response (orjson)", trusted, service, rows, field, args.rounds)
+    print(f"speedup: {baseline / fast:.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
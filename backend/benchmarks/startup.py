@@ -0,0 +1,95 @@
+"""
+Worker boot time, measured in fresh interpreters.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --importtime 15
+
+Each run starts a new Python process and times the phases a uvicorn
+worker goes through before it can serve: importing app.main, building
+the app with create_app(), running the lifespan startup, and answering
+a first request. --importtime also lists the slowest imports of one run
+(python -X importtime, cumulative microseconds).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+import httpx  # client for the first request; not part of the boot path
+
+async def boot():
+    entered = time.perf_counter()
+    async with application.router.lifespan_context(application):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://boot") as client:
+            (await client.get("/health")).raise_for_status()
+        served = time.perf_counter()
+    return entered, ready, served
+
+entered, ready, served = asyncio.run(boot())
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "lifespan": ready - entered,
+    "first_request": served - ready,
+    "total": (created - started) + (served - entered),
+    "lazy_modules_loaded": sorted(name for name in ("passlib", "jose", "bcrypt") if name in sys.modules),
+}))
+"""
+
+PHASES = ("import", "create_app", "lifespan", "first_request", "total")
+
+def run_once() -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def slowest_imports(count: int) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main; app.main.create_app()"],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:count]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure API worker boot time.")
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes to time")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+    
+    runs = [run_once() for _ in range(args.runs)]
+    report = {
+        phase: {
+            "median_ms": statistics.median(run[phase] for run in runs) * 1000,
+            "min_ms": min(run[phase] for run in runs) * 1000,
+        }
+        for phase in PHASES
+    }
+    print(f"{'phase':16} {'median ms':>10} {'min ms':>10}")
+    for phase, stats in report.items():
+        print(f"{phase:16} {stats['median_ms']:>10.1f} {stats['min_ms']:>10.1f}")
+    print(f"lazily imported modules loaded during boot: {', '.join(runs[0]['lazy_modules_loaded']) or 'none'}")
+    
+    if args.importtime:
+        print(f"\n{'cumulative ms':>14}  module")
+        for cumulative, name in slowest_imports(args.importtime):
+            print(f"{cumulative / 1000:>14.1f}  {name}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": args.runs, "phases": report}, f, indent=2)
+
+if __name__ == "__main__":
+    main()